@@ -15,4 +15,213 @@ window.dapp  = Object.assign({}, window.dapp, {
             row.getElement().addClass("success");
         },
     }
-});
\ No newline at end of file
+});
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    common:{
+        decodeArray:function(b64, type){
+            // Decode a base64 string of little-endian bytes to a typed array.
+            var bytes = Uint8Array.from(atob(b64), function(c){return c.charCodeAt(0);});
+            return new type(bytes.buffer);
+        },
+    },
+    boids:{
+        decodeFrames:function(chunk){
+            // Decode compact frames of float32 positions and uint8 symbol codes to Plotly frames.
+            var decode = window.dash_clientside.common.decodeArray;
+            var axes = ["x", "y", "z"].filter(function(axis){return axis in chunk;});
+            var positions = axes.map(function(axis){return decode(chunk[axis], Float32Array);});
+            var symbol = decode(chunk.symbol, Uint8Array);
+            var N = chunk.agents;
+            var frames = [];
+            for (var f = 0; f < chunk.frames; f++){
+                var datum = {
+                    mode:"markers",
+                    marker:{symbol:Array.from(symbol.subarray(f*N, (f+1)*N), function(s){
+                        return chunk.symbols[s];
+                    })},
+                };
+                axes.forEach(function(axis, k){
+                    datum[axis] = positions[k].subarray(f*N, (f+1)*N);
+                });
+                frames.push({name:chunk.start + f, data:[datum]});
+            }
+            return frames;
+        },
+        extendFrames:function(chunk, id, played){
+            // Append a streamed chunk of frames to the graph and queue their playback.
+            var graph = document.getElementById(id);
+            var gd = graph && graph.getElementsByClassName("js-plotly-plot")[0];
+            if (!gd || !chunk || !chunk.frames){
+                return window.dash_clientside.no_update;
+            }
+            var frames = window.dash_clientside.boids.decodeFrames(chunk);
+            var names = frames.map(function(frame){return frame.name;});
+            Plotly.addFrames(gd, frames).then(function(){
+                Plotly.animate(gd, names, {
+                    mode:"afterall",
+                    frame:{duration:chunk.duration, redraw:Boolean(chunk.redraw)},
+                    transition:{duration:chunk.duration, easing:"linear"},
+                });
+            });
+            return (played || 0) + frames.length;
+        },
+    },
+    gol:{
+        queue:[],
+        timer:null,
+        flipCells:function(gd, flips, cols){
+            // Flip cells of the heatmap, given as flat indices y*cols+x.
+            var z = gd.data[0].z;
+            flips.forEach(function(i){
+                var row = z[Math.floor(i/cols)];
+                row[i%cols] = 1 - row[i%cols];
+            });
+            Plotly.restyle(gd, {z:[z]}, [0]);
+        },
+        playFrames:function(gd){
+            // Play queued frames, one per duration, until the queue empties.
+            var gol = window.dash_clientside.gol;
+            if (gol.timer !== null){
+                return;
+            }
+            var step = function(){
+                var frame = gol.queue.shift();
+                if (!frame){
+                    gol.timer = null;
+                    return;
+                }
+                gol.flipCells(gd, frame.flips, frame.cols);
+                gol.timer = setTimeout(step, frame.duration);
+            };
+            step();
+        },
+        applyDelta:function(delta, id, data){
+            // Queue the frames of a server board delta for playback and acknowledge its generation.
+            var gol = window.dash_clientside.gol;
+            var graph = document.getElementById(id);
+            var gd = graph && graph.getElementsByClassName("js-plotly-plot")[0];
+            if (!gd || !delta || !delta.session){
+                return window.dash_clientside.no_update;
+            }
+            if (delta.resync){
+                // Play queued frames at once, then send live cells for the server to rebuild a dropped session.
+                clearTimeout(gol.timer);
+                gol.timer = null;
+                gol.queue.splice(0).forEach(function(frame){gol.flipCells(gd, frame.flips, frame.cols);});
+                var cells = [];
+                var z = gd.data[0].z;
+                z.forEach(function(row, r){
+                    row.forEach(function(v, c){if (v){cells.push(r*row.length + c);}});
+                });
+                return {
+                    session:delta.session,
+                    generation:data && "generation" in data ? data.generation : -1,
+                    rows:z.length,
+                    cols:z.length ? z[0].length : 0,
+                    cells:cells,
+                };
+            }
+            if ("board" in delta){
+                // Rebuild the whole board from flat indices of live cells, dropping queued frames.
+                gol.queue = [];
+                var z = [];
+                for (var r = 0; r < delta.rows; r++){
+                    z.push(new Array(delta.cols).fill(0));
+                }
+                delta.board.forEach(function(i){z[Math.floor(i/delta.cols)][i%delta.cols] = 1;});
+                Plotly.restyle(gd, {z:[z]}, [0]);
+            } else if (data && data.session == delta.session && data.generation + delta.frames.length == delta.generation){
+                delta.frames.forEach(function(flips){
+                    gol.queue.push({flips:flips, cols:delta.cols, duration:delta.duration});
+                });
+                gol.playFrames(gd);
+            } else {
+                // Skip stale deltas, so that the server resends the board on its next call.
+                return window.dash_clientside.no_update;
+            }
+            if ("name" in delta){
+                Plotly.restyle(gd, {name:[delta.name]}, [0]);
+            }
+            if ("title" in delta){
+                Plotly.relayout(gd, {title:delta.title});
+            }
+            return {session:delta.session, generation:delta.generation};
+        },
+    },
+    fractal:{
+        getView:function(relayoutData, seed, generator, id){
+            // Read the axis ranges of a zoom or pan, and the size of the graph in pixels, for the level of detail.
+            // Edits of the seed or generator autorange the axes, so forget the view.
+            var triggered = window.dash_clientside.callback_context.triggered.map(function(t){return t.prop_id;});
+            if (triggered.some(function(prop_id){return prop_id.endsWith(".figure");})){
+                return null;
+            }
+            var graph = document.getElementById(id);
+            if (!graph || !relayoutData){
+                return window.dash_clientside.no_update;
+            }
+            if (relayoutData["xaxis.autorange"] || relayoutData["yaxis.autorange"]){
+                return null;
+            }
+            var range = function(axis){
+                if (relayoutData[axis + ".range"]){
+                    return relayoutData[axis + ".range"].slice();
+                }
+                if ((axis + ".range[0]") in relayoutData && (axis + ".range[1]") in relayoutData){
+                    return [relayoutData[axis + ".range[0]"], relayoutData[axis + ".range[1]"]];
+                }
+                return null;
+            };
+            var x = range("xaxis");
+            var y = range("yaxis");
+            if (!x || !y){
+                return window.dash_clientside.no_update;
+            }
+            return {
+                x:x,
+                y:y,
+                width:graph.clientWidth,
+                height:graph.clientHeight,
+                autorange:false,
+            };
+        },
+        plotSegments:function(data, figure){
+            // Plot encoded fractal segments as static and fractal traces of [start, end, gap] points.
+            var decode = window.dash_clientside.common.decodeArray;
+            var N = data.fractal.count;
+            var segments = decode(data.fractal.segments, Float32Array);
+            // Add float32 offsets back to their float64 origin.
+            var origin = data.fractal.origin || [0, 0];
+            var mask = decode(data.fractal.mask, Uint8Array);
+            var fractal = new Uint8Array(N);
+            var counts = [0, 0];
+            for (var i = 0; i < N; i++){
+                // Bits are packed most significant first, as by np.packbits.
+                fractal[i] = (mask[i >> 3] >> (7 - (i & 7))) & 1;
+                counts[fractal[i]]++;
+            }
+            var xs = counts.map(function(count){return new Float64Array(3*count);});
+            var ys = counts.map(function(count){return new Float64Array(3*count);});
+            var ks = [0, 0];
+            for (var i = 0; i < N; i++){
+                var j = fractal[i];
+                var k = 3*ks[j]++;
+                xs[j][k] = origin[0] + segments[4*i];
+                ys[j][k] = origin[1] + segments[4*i+1];
+                xs[j][k+1] = origin[0] + segments[4*i+2];
+                ys[j][k+1] = origin[1] + segments[4*i+3];
+                xs[j][k+2] = NaN;
+                ys[j][k+2] = NaN;
+            }
+            var traces = figure.data.map(function(trace, j){
+                return j < 2 ? Object.assign({}, trace, {x:xs[j], y:ys[j]}) : trace;
+            });
+            // Keep the viewport across iterations, until the seed or generator is edited.
+            var layout = Object.assign({}, figure.layout, {
+                title:"Fractal Iteration #" + data.n,
+                uirevision:data.revision,
+            });
+            return [Object.assign({}, figure, {data:traces, layout:layout}), Boolean(data.complete)];
+        },
+    },
+});
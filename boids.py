@@ -2,10 +2,19 @@
 ####################################################################################################
 
 # Open-source packages.
+import os
+import glob
+import base64
+import hashlib
+import threading
+import tracemalloc
+import timeit
 import numpy as np
 import pandas as pd
 import typing as tp
 import itertools as it
+import collections as co
+import scipy.spatial as ss
 
 # Dash imports.
 import dash
@@ -14,11 +23,30 @@ import dash.exceptions as dex
 import dash.dependencies as ddp
 import dash_bootstrap_components as dbc
 
+# In-house packages.
+import constants
+
 ####################################################################################################
 
 class BoidSimulation(object):
     
     _dims = 2,
+    _axes = ["x", "y", "z"]
+    _neighbors = ["merge", "grid", "kdtree"]
+    _engines = ["pandas", "numpy"]
+    _boundaries = ["open", "torus", "walls"]
+    _checkpoint_attrs = [
+        "visibility",
+        "seperation",
+        "cohesion",
+        "alignment",
+        "time",
+        "step",
+        "neighbors",
+        "engine",
+        "dims",
+        "boundary",
+    ]
 
     def __init__(
         self,
@@ -29,6 +57,13 @@ class BoidSimulation(object):
         alignment:float=1,
         time:float=60,
         step:float=1,
+        neighbors:str="merge",
+        engine:str="pandas",
+        dims:int=2,
+        profile:tp.Union[bool, tp.Callable[[str, float, int], None]]=False,
+        profile_memory:bool=False,
+        boundary:str="open",
+        arena:tp.Tuple[float, float]=(-10, 10),
     ) -> object:
         """
         > Initialize an iterator that yields iterations of a Boid simulation. 
@@ -43,25 +78,68 @@ class BoidSimulation(object):
             alignment: Strength of orientation to neighboring Boids.
             time: Length of simulation in seconds.
             step: Length of iteration, in seconds.
+            neighbors: Neighbor search engine, one of:
+                "merge": Self-cross-join of all Boids, O(N^2).
+                "grid": Uniform grid of visibility-sized cells, pairing Boids in adjacent cells.
+                "kdtree": KD-tree of Boid positions, pairing Boids within visibility.
+            engine: Simulation engine, one of:
+                "pandas": Dataframes of (center, neighbor) pairs, aggregated by group.
+                "numpy": Arrays of positions, velocities and types, aggregated by bincount.
+                         Dataframes are only built when the state is requested.
+                         Static repulsors (with zero velocity) are indexed once, as obstacles.
+            dims: Number of spatial dimensions, with axes "x", "y", "z" in order.
+            profile: Whether to record wall time per phase of each iteration.
+                     If callable, it is also called as profile(phase, seconds, bytes) per phase.
+                     Cumulative statistics are exposed by the stats property.
+            profile_memory: Whether to also record the peak bytes allocated per phase, by tracing allocations.
+                            Tracing slows every allocation, so phase times are only accurate without it.
+            boundary: Behaviour of Boids at the edges of the arena, one of:
+                "open": Unbounded space, ignoring the arena.
+                "torus": Periodic space, wrapping Boids across edges and pairing neighbors across them.
+                "walls": Bounded space, reflecting Boids off edges.
+            arena: Pair (low, high) of bounds of the arena along every axis.
         Returns:
             Iterable yielding Boid simulation iterations.
         """
         # Check types.
+        if neighbors not in BoidSimulation._neighbors:
+            raise ValueError(f"Neighbors must be one of {BoidSimulation._neighbors}: {neighbors}")
+        if engine not in BoidSimulation._engines:
+            raise ValueError(f"Engine must be one of {BoidSimulation._engines}: {engine}")
+        if not isinstance(dims, int) or not 0<dims<=len(BoidSimulation._axes):
+            raise ValueError(f"Dims must be an integer between 1 and {len(BoidSimulation._axes)}: {dims}")
+        if boundary not in BoidSimulation._boundaries:
+            raise ValueError(f"Boundary must be one of {BoidSimulation._boundaries}: {boundary}")
+        if not arena[0] < arena[1]:
+            raise ValueError(f"Arena must be a pair of increasing bounds: {arena}")
+        if not visibility > 0:
+            raise ValueError(f"Visibility must be positive: {visibility}")
 
         # Set public attributes.
-        self.state = state
+        self.engine = engine
         self.visibility = visibility
         self.seperation = seperation
         self.cohesion = cohesion
         self.alignment = alignment
         self.time = time
         self.step = step
+        self.neighbors = neighbors
+        self.dims = dims
+        self.boundary = boundary
+        self.arena = tuple(arena)
+        self.profiler = BoidProfiler(
+            callback=profile if callable(profile) else None,
+            memory=profile_memory,
+        ) if profile or profile_memory else None
 
         # Set internal attributes.
-        self._dims:tp.List[str] = ["x", "y"]
+        self._dims:tp.List[str] = BoidSimulation._axes[:dims]
         self._N:int = self.time//self.step
         self._n:int = 0
 
+        # Set initial state.
+        self.state = state
+
     def __iter__(self) -> object:
         return self
     
@@ -74,20 +152,292 @@ class BoidSimulation(object):
         Returns:
             List-of-pairs [(x, y), ...] coordinates of next live cells. 
         """
+        self.advance()
+        return self.state
+
+    def advance(self) -> None:
+        """
+        > Advance the Boid simulation by one iteration, without returning its state.
+        
+        Arguments:
+            None
+        Returns:
+            None
+        """
         if self._n  >= self._N:
             raise StopIteration
-        state = BoidSimulation._get_next_state(
-            state=self.state,
-            seperation=self.seperation,
-            cohesion=self.cohesion,
-            alignment=self.alignment,
-            visibility=self.visibility,
-            dimensions=self._dims,
-            step=self.step,
-        )
-        self.state = state
+        profiler = self.profiler
+        if profiler:
+            profiler.start()
+        try:
+            self._advance(profiler=profiler)
+        finally:
+            if profiler:
+                profiler.stop()
         self._n += 1
-        return state
+
+    def _advance(self, profiler:tp.Callable[[str], None]=None) -> None:
+        if self.engine == "numpy":
+            # Build the static obstacle index, once per visibility and neighbor search.
+            key = (self.visibility, self.neighbors, self.boundary, self.arena)
+            if self._index_key != key:
+                obstacles, period = self._p[self._s], None
+                if self.boundary == "torus":
+                    obstacles, period = BoidSimulation._get_torus_positions(positions=obstacles, arena=self.arena)
+                self._index = BoidSimulation._get_neighbor_index(
+                    positions=obstacles,
+                    radius=self.visibility,
+                    neighbors=self.neighbors,
+                    period=period,
+                )
+                self._index_key = key
+                if profiler:
+                    profiler("index")
+            # Advance mobile Boids only.
+            m = ~self._s
+            p, v = BoidSimulation._get_next_arrays(
+                positions=self._p[m],
+                velocities=self._v[m],
+                repulsors=self._r[m],
+                seperation=self.seperation,
+                cohesion=self.cohesion,
+                alignment=self.alignment,
+                visibility=self.visibility,
+                step=self.step,
+                neighbors=self.neighbors,
+                obstacles=self._p[self._s],
+                index=self._index,
+                boundary=self.boundary,
+                arena=self.arena,
+                profiler=profiler,
+            )
+            self._p, self._v = self._p.copy(), self._v.copy()
+            self._p[m], self._v[m] = p, v
+            self._state = None
+        else:
+            self._state = BoidSimulation._get_next_state(
+                state=self._state,
+                seperation=self.seperation,
+                cohesion=self.cohesion,
+                alignment=self.alignment,
+                visibility=self.visibility,
+                dimensions=self._dims,
+                step=self.step,
+                neighbors=self.neighbors,
+                boundary=self.boundary,
+                arena=self.arena,
+                profiler=profiler,
+            )
+
+    @property
+    def state(self) -> pd.DataFrame:
+        """
+        > Dataframe with columns "t", "px", "py", ..., "vx", "vy", ... encoding current Boids.
+        """
+        if self._state is None:
+            self._state = pd.DataFrame({
+                "t":self._labels[self._t],
+                **{f"p{i}":self._p[:, k] for k, i in enumerate(self._dims)},
+                **{f"v{i}":self._v[:, k] for k, i in enumerate(self._dims)},
+            })
+        return self._state
+
+    @state.setter
+    def state(self, state:pd.DataFrame) -> None:
+        self._state = state
+        if self.engine == "numpy":
+            # Unpack state into contiguous arrays.
+            t, labels = pd.factorize(state["t"])
+            self._t:np.ndarray = t.astype(np.int8)
+            self._labels:np.ndarray = np.asarray(labels, dtype=object)
+            self._r:np.ndarray = self._labels[self._t] == "repulsor"
+            self._p:np.ndarray = np.ascontiguousarray(state[[f"p{i}" for i in self._dims]], dtype=np.float64)
+            self._v:np.ndarray = np.ascontiguousarray(state[[f"v{i}" for i in self._dims]], dtype=np.float64)
+            # Split static repulsors from mobile Boids.
+            self._s:np.ndarray = self._r & ~self._v.any(axis=1)
+            self._index:object = None
+            self._index_key:tuple = None
+
+    def checkpoint(self, path:tp.Union[str, tp.BinaryIO]) -> None:
+        """
+        > Save a snapshot of the simulation, from which BoidSimulation.resume continues it.
+
+        Arguments:
+            path: Path of the .npz snapshot, written atomically, or a writable binary file.
+                  The snapshot holds Boid types, positions and velocities, parameters and the iteration index.
+                  Iterations are deterministic, so no random state is needed to continue them.
+        Returns:
+            None
+        """
+        if self.engine == "numpy":
+            types = self._labels[self._t]
+        else:
+            types = self._state["t"].values
+        arrays = {
+            "types":np.asarray(types, dtype=str),
+            "positions":self.positions,
+            "velocities":self.velocities,
+            "arena":np.array(self.arena),
+            "n":np.array(self._n),
+            **{
+                attr:np.array(getattr(self, attr))
+                for attr in BoidSimulation._checkpoint_attrs
+            },
+        }
+        if not isinstance(path, str):
+            np.savez(path, **arrays)
+            return
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temp, path)
+
+    @staticmethod
+    def resume(path:tp.Union[str, tp.BinaryIO], **kwargs:dict) -> object:
+        """
+        > Initialize a Boid simulation continuing from a snapshot saved by BoidSimulation.checkpoint.
+
+        Arguments:
+            path: Path of the .npz snapshot, or a readable binary file.
+            kwargs: BoidSimulation keyword arguments overriding those of the snapshot.
+                    For example, a larger time extends the simulation, to shard long runs across processes.
+        Returns:
+            Iterable yielding the remaining Boid simulation iterations.
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            arrays = dict(npz)
+        params = {attr:arrays[attr].item() for attr in BoidSimulation._checkpoint_attrs}
+        params["arena"] = tuple(arrays["arena"].tolist())
+        axes = BoidSimulation._axes[:params["dims"]]
+        state = pd.DataFrame({
+            "t":arrays["types"].astype(object),
+            **{f"p{i}":arrays["positions"][:, k] for k, i in enumerate(axes)},
+            **{f"v{i}":arrays["velocities"][:, k] for k, i in enumerate(axes)},
+        })
+        sim = BoidSimulation(state=state, **{**params, **kwargs})
+        sim._n = arrays["n"].item()
+        return sim
+
+    @property
+    def stats(self) -> tp.Dict[str, tp.Dict[str, float]]:
+        """
+        > Dictionary of cumulative "calls" and "time" (seconds), and maximum peak "bytes" (None unless traced), per profiled phase.
+        """
+        if self.profiler is None:
+            return {}
+        return self.profiler.stats
+
+    @property
+    def positions(self) -> np.ndarray:
+        """
+        > Array of shape (N, D) encoding current Boid positions.
+        """
+        if self.engine == "numpy":
+            return self._p
+        return self.state[[f"p{i}" for i in self._dims]].values
+
+    @property
+    def velocities(self) -> np.ndarray:
+        """
+        > Array of shape (N, D) encoding current Boid velocities.
+        """
+        if self.engine == "numpy":
+            return self._v
+        return self.state[[f"v{i}" for i in self._dims]].values
+
+    @staticmethod
+    def run_ensemble(
+        states:tp.List[pd.DataFrame],
+        parameters:tp.List[dict],
+        time:float=60,
+        step:float=1,
+        neighbors:str="grid",
+        dims:int=2,
+    ) -> tp.List[tp.Dict[str, np.ndarray]]:
+        """
+        > Run an ensemble of Boid simulations, advancing all runs together in batched arrays.
+        
+        Arguments:
+            states: List of K dataframes encoding initial Boids per run, as in BoidSimulation.
+            parameters: List of K dictionaries of BoidSimulation keyword arguments per run,
+                        among "visibility", "seperation", "cohesion" and "alignment".
+            time: Length of simulations in seconds.
+            step: Length of iteration, in seconds.
+            neighbors: Neighbor search engine, one of "merge", "grid" or "kdtree".
+            dims: Number of spatial dimensions.
+        Returns:
+            List of K dictionaries with "positions" and "velocities" arrays of shape (T, N, D) per run.
+        """
+        if len(states) != len(parameters):
+            raise ValueError(f"Expected as many parameters as states: {len(parameters)}!={len(states)}")
+        sims = [
+            BoidSimulation(
+                state=state,
+                time=time,
+                step=step,
+                neighbors=neighbors,
+                engine="numpy",
+                dims=dims,
+                **params,
+            )
+            for state, params in zip(states, parameters)
+        ]
+        if not sims:
+            return []
+
+        # Stack runs into batched arrays, labelling Boids by run.
+        K = len(sims)
+        sizes = [len(sim._p) for sim in sims]
+        groups = np.repeat(np.arange(K), sizes)
+        p = np.concatenate([sim._p for sim in sims])
+        v = np.concatenate([sim._v for sim in sims])
+        r = np.concatenate([sim._r for sim in sims])
+        s = np.concatenate([sim._s for sim in sims])
+        kwargs = {
+            attr:np.array([getattr(sim, attr) for sim in sims], dtype=np.float64)
+            for attr in ("seperation", "cohesion", "alignment", "visibility")
+        }
+        if not (kwargs["visibility"] > 0).all():
+            raise ValueError(f"Ensemble visibilities must be positive: {kwargs['visibility']}")
+
+        # Index static repulsors of all runs once.
+        m = ~s
+        index = BoidSimulation._get_neighbor_index(
+            positions=BoidSimulation._get_search_positions(
+                positions=p[s],
+                visibility=kwargs["visibility"],
+                groups=groups[s],
+            )[0],
+            radius=1,
+            neighbors=neighbors,
+        )
+
+        # Advance all runs, recording frames.
+        T = int(sims[0]._N)
+        P = np.empty((T, *p.shape))
+        V = np.empty((T, *v.shape))
+        for n in range(T):
+            p, v = p.copy(), v.copy()
+            p[m], v[m] = BoidSimulation._get_next_arrays(
+                positions=p[m],
+                velocities=v[m],
+                repulsors=r[m],
+                step=step,
+                neighbors=neighbors,
+                obstacles=p[s],
+                index=index,
+                groups=groups[m],
+                obstacle_groups=groups[s],
+                **kwargs,
+            )
+            P[n], V[n] = p, v
+
+        # Split frames by run.
+        splits = np.cumsum(sizes)[:-1]
+        return [
+            {"positions":positions, "velocities":velocities}
+            for positions, velocities in zip(np.split(P, splits, axis=1), np.split(V, splits, axis=1))
+        ]
 
     @staticmethod
     def _get_next_state(
@@ -98,18 +448,41 @@ class BoidSimulation(object):
         visibility:float,
         dimensions:tp.List[str],
         step:float,
+        neighbors:str="merge",
+        boundary:str="open",
+        arena:tp.Tuple[float, float]=None,
+        profiler:tp.Callable[[str], None]=None,
     ) -> pd.DataFrame:
 
-        # Self-cross-product Boids for all (center, neighbor) pairs.
+        period = arena[1] - arena[0] if boundary == "torus" else None
         state["i"] = range(len(state))
-        state["j"] = 0
-        pairs = pd.merge(
-            left=state,
-            right=state.add_prefix(prefix="n"),
-            left_on="j",
-            right_on="nj",
-            how="outer",
-        )
+        if neighbors == "merge":
+            # Self-cross-product Boids for all (center, neighbor) pairs.
+            state["j"] = 0
+            pairs = pd.merge(
+                left=state,
+                right=state.add_prefix(prefix="n"),
+                left_on="j",
+                right_on="nj",
+                how="outer",
+            )
+        else:
+            # Pair Boids with (center, neighbor) candidates from a spatial search.
+            search = state[[f"p{i}" for i in dimensions]].values
+            if period is not None:
+                search, period = BoidSimulation._get_torus_positions(positions=search, arena=arena)
+            i, j = BoidSimulation._get_neighbor_pairs(
+                positions=search,
+                radius=visibility,
+                neighbors=neighbors,
+                period=period,
+            )
+            pairs = pd.concat(axis=1, objs=[
+                state.iloc[i].reset_index(drop=True),
+                state.add_prefix(prefix="n").iloc[j].reset_index(drop=True),
+            ])
+        if profiler:
+            profiler("join")
 
         # Unpack columns.
         cols = [
@@ -128,12 +501,17 @@ class BoidSimulation(object):
         for pi, npi, ndi in zip(p, np, nd):
             # Compute neighbor-to-center translations.
             pairs[ndi] = pairs[pi] - pairs[npi]
+            if period is not None:
+                # Translate to the nearest periodic image of the neighbor.
+                pairs[ndi] -= period * (pairs[ndi]/period).round()
 
         # Compute neighbor-to-center distances.
         ndmag = pairs[nd].pow(2).sum(axis=1).pow(0.5)
 
         # Subset pairs to visible neighbors.
         pairs = pairs.loc[ndmag.le(visibility)]
+        if profiler:
+            profiler("filter")
 
         # For each dimension:
         for ndi in nd:
@@ -168,6 +546,8 @@ class BoidSimulation(object):
         agg = {**agg_last, **agg_mean}
         groups = pairs.groupby(by="i", as_index=False, sort=False)
         state = groups.agg(func=agg).drop(columns="i")
+        if profiler:
+            profiler("aggregate")
 
         # For each dimension:
         for pi, npi in zip(p, np):
@@ -184,16 +564,495 @@ class BoidSimulation(object):
             # Update velocities and positions.
             state[vi] += ai * step**2
             state[pi] += state[vi] * step
+        if boundary != "open":
+            # Keep Boids within the arena.
+            state[p], state[v] = BoidSimulation._get_bounded_arrays(
+                positions=state[p].values,
+                velocities=state[v].values,
+                boundary=boundary,
+                arena=arena,
+            )
+        if profiler:
+            profiler("update")
 
         return state
 
     @staticmethod
-    def get_random_boids_state(num_boids:int=100, loc:float=0, scale:float=1) -> pd.DataFrame:
-        dims = 2
-        data = np.random.normal(size=(num_boids, dims), loc=loc, scale=scale)
-        state = pd.DataFrame(data=data, columns=["px", "py"])
-        state["vx"] = 0
-        state["vy"] = 0
+    def _get_next_arrays(
+        positions:np.ndarray,
+        velocities:np.ndarray,
+        repulsors:np.ndarray,
+        seperation:float,
+        cohesion:float,
+        alignment:float,
+        visibility:float,
+        step:float,
+        neighbors:str="grid",
+        obstacles:np.ndarray=None,
+        index:object=None,
+        groups:np.ndarray=None,
+        obstacle_groups:np.ndarray=None,
+        boundary:str="open",
+        arena:tp.Tuple[float, float]=None,
+        profiler:tp.Callable[[str], None]=None,
+    ) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Compute the next Boid positions and velocities, mirroring _get_next_state on arrays.
+
+        Arguments:
+            positions: Array of shape (N, D) encoding Boid positions.
+            velocities: Array of shape (N, D) encoding Boid velocities.
+            repulsors: Boolean array of shape (N,) indicating repulsor Boids.
+            seperation: Strength of repulsion to neighboring Boids.
+            cohesion: Strength of attraction to flocks of Boids.
+            alignment: Strength of orientation to neighboring Boids.
+            visibility: Radius in which a Boid perceives its neighbors.
+            step: Length of iteration, in seconds.
+            neighbors: Neighbor search engine, one of "merge", "grid" or "kdtree".
+            obstacles: Array of shape (M, D) encoding static repulsor positions.
+            index: Spatial index of obstacle search positions, from _get_neighbor_index.
+            groups: Integer array of shape (N,) labelling Boids by run, for batched ensembles.
+                    Seperation, cohesion, alignment and visibility are then arrays of shape (K,) per run.
+            obstacle_groups: Integer array of shape (M,) labelling obstacles by run.
+            boundary: Behaviour of Boids at the edges of the arena, one of "open", "torus" or "walls".
+                      Batched ensembles are only supported in open space.
+            arena: Pair (low, high) of bounds of the arena along every axis.
+            profiler: Function called with the name of each phase as it ends, as BoidProfiler.
+        Returns:
+            Pair of arrays (positions, velocities) encoding the next Boids.
+        """
+        N, D = positions.shape
+        if boundary != "open" and groups is not None:
+            raise ValueError(f"Batched ensembles only support open boundaries: {boundary}")
+
+        # Find visible (center, neighbor) pairs.
+        search, radius = BoidSimulation._get_search_positions(
+            positions=positions,
+            visibility=visibility,
+            groups=groups,
+        )
+        period = None
+        if boundary == "torus":
+            search, period = BoidSimulation._get_torus_positions(positions=search, arena=arena)
+        i, j = BoidSimulation._get_neighbor_pairs(
+            positions=search,
+            radius=radius,
+            neighbors=neighbors,
+            period=period,
+            profiler=profiler,
+        )
+
+        # Find obstacles visible to non-repulsor centers.
+        has_obstacles = obstacles is not None and len(obstacles)
+        if has_obstacles:
+            centers = np.flatnonzero(~repulsors)
+            others = BoidSimulation._get_search_positions(
+                positions=obstacles,
+                visibility=visibility,
+                groups=obstacle_groups,
+            )[0]
+            if period is not None:
+                others = BoidSimulation._get_torus_positions(positions=others, arena=arena)[0]
+            k, l = BoidSimulation._get_neighbor_pairs(
+                positions=search[centers],
+                radius=radius,
+                neighbors=neighbors,
+                others=others,
+                index=index,
+                period=period,
+            )
+            if profiler:
+                profiler("obstacles")
+
+        # Drop pairs whose neighbor is the center, or whose center is a repulsor.
+        keep = (i != j) & ~repulsors[i]
+        i, j = i[keep], j[keep]
+
+        # Compute neighbor-to-center translations and distances.
+        nd = positions[i] - positions[j]
+        if period is not None:
+            nd -= period * np.round(nd/period)
+        ndmag = np.sqrt(np.square(nd).sum(axis=1))
+
+        # Transform neighbor-to-center translations to repulsions, amplifying repulsors.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            nd /= (ndmag**2)[:, None]
+        nd[repulsors[j]] *= 30
+        ndi = i
+
+        if has_obstacles:
+            # Transform obstacle-to-center translations to amplified repulsions.
+            od = positions[centers[k]] - obstacles[l]
+            if period is not None:
+                od -= period * np.round(od/period)
+            odmag = np.sqrt(np.square(od).sum(axis=1))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                od /= (odmag**2)[:, None]
+            od *= 30
+            ndi = np.concatenate([ndi, centers[k]])
+            nd = np.concatenate([nd, od])
+        finite = ~np.isnan(nd).any(axis=1)
+
+        # Transform neighbor velocities to (unit) neighbor directions, ignoring repulsors.
+        boids = ~repulsors[j]
+        nv = velocities[j[boids]]
+        nvmag = np.sqrt(np.square(nv).sum(axis=1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            nv = np.where((nvmag > 0)[:, None], nv/nvmag[:, None], 0)
+        nps = positions[j[boids]]
+
+        # Average neighbor information per center Boid.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ndmean = BoidSimulation._get_group_means(groups=ndi[finite], values=nd[finite], size=N)
+            npmean = BoidSimulation._get_group_means(groups=i[boids], values=nps, size=N) - positions
+            nvmean = BoidSimulation._get_group_means(groups=i[boids], values=nv, size=N)
+        if profiler:
+            profiler("aggregate")
+
+        if groups is not None:
+            # Broadcast run parameters to Boids.
+            seperation = seperation[groups][:, None]
+            cohesion = cohesion[groups][:, None]
+            alignment = alignment[groups][:, None]
+
+        # Compute accelerations.
+        a = 0
+        a += seperation * np.nan_to_num(ndmean, nan=0)
+        a += cohesion * np.nan_to_num(npmean, nan=0)
+        a += alignment * np.nan_to_num(nvmean, nan=0)
+
+        # Update velocities and positions.
+        velocities = velocities + a * step**2
+        positions = positions + velocities * step
+        if boundary != "open":
+            positions, velocities = BoidSimulation._get_bounded_arrays(
+                positions=positions,
+                velocities=velocities,
+                boundary=boundary,
+                arena=arena,
+            )
+        if profiler:
+            profiler("update")
+        return positions, velocities
+
+    @staticmethod
+    def _get_search_positions(
+        positions:np.ndarray,
+        visibility:tp.Union[float, np.ndarray],
+        groups:np.ndarray=None,
+    ) -> tp.Tuple[np.ndarray, float]:
+        """
+        > Map Boid positions to the space in which neighbors are searched.
+
+        Arguments:
+            positions: Array of shape (N, D) encoding Boid positions.
+            visibility: Radius in which a Boid perceives its neighbors, or array of shape (K,) per run.
+            groups: Integer array of shape (N,) labelling Boids by run.
+        Returns:
+            Pair (search, radius) of search positions and search radius.
+            Without groups, positions are searched within visibility.
+            With groups, positions are scaled by their run visibility to a unit search radius,
+            and an extra coordinate spaces runs apart so that no pair crosses runs.
+        """
+        if groups is None:
+            return positions, visibility
+        search = np.column_stack([positions/visibility[groups][:, None], 3*groups])
+        return search, 1
+
+    @staticmethod
+    def _get_torus_positions(positions:np.ndarray, arena:tp.Tuple[float, float]) -> tp.Tuple[np.ndarray, float]:
+        """
+        > Map positions in a periodic arena to the box [0, period) along every axis.
+
+        Arguments:
+            positions: Array of shape (N, D) encoding positions.
+            arena: Pair (low, high) of bounds of the arena along every axis.
+        Returns:
+            Pair (positions, period) of wrapped positions and the side length of the arena.
+        """
+        period = arena[1] - arena[0]
+        wrapped = np.mod(positions - arena[0], period)
+        # Rounding may wrap tiny negative offsets onto the upper bound.
+        wrapped[wrapped >= period] = 0
+        return wrapped, period
+
+    @staticmethod
+    def _get_bounded_arrays(
+        positions:np.ndarray,
+        velocities:np.ndarray,
+        boundary:str,
+        arena:tp.Tuple[float, float],
+    ) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Return Boids to the arena, wrapping them across edges or reflecting them off edges.
+
+        Arguments:
+            positions: Array of shape (N, D) encoding Boid positions.
+            velocities: Array of shape (N, D) encoding Boid velocities.
+            boundary: One of "open", "torus" or "walls", as in BoidSimulation.
+            arena: Pair (low, high) of bounds of the arena along every axis.
+        Returns:
+            Pair of arrays (positions, velocities) encoding the bounded Boids.
+        """
+        low, high = arena
+        period = high - low
+        if boundary == "torus":
+            positions = low + BoidSimulation._get_torus_positions(positions=positions, arena=arena)[0]
+        elif boundary == "walls":
+            # Fold positions into the arena, reversing velocities after an odd number of reflections.
+            folded = np.mod(positions - low, 2*period)
+            reflections = np.floor((positions - low)/period)
+            positions = low + np.where(folded > period, 2*period - folded, folded)
+            velocities = np.where(np.mod(reflections, 2) == 1, -velocities, velocities)
+        return positions, velocities
+
+    @staticmethod
+    def _get_group_means(groups:np.ndarray, values:np.ndarray, size:int) -> np.ndarray:
+        """
+        > Average rows of values by integer group, with NaN for empty groups.
+
+        Arguments:
+            groups: Integer array of shape (M,) labelling rows with groups in [0, size).
+            values: Array of shape (M, D) to average.
+            size: Number of groups.
+        Returns:
+            Array of shape (size, D) of group means.
+        """
+        counts = np.bincount(groups, minlength=size)
+        sums = np.stack(axis=1, arrays=[
+            np.bincount(groups, weights=values[:, k], minlength=size)
+            for k in range(values.shape[1])
+        ])
+        return sums/counts[:, None]
+
+    @staticmethod
+    def _get_neighbor_index(
+        positions:np.ndarray,
+        radius:float,
+        neighbors:str="grid",
+        period:float=None,
+    ) -> object:
+        """
+        > Build a reusable spatial index of points, for repeated neighbor queries.
+
+        Arguments:
+            positions: Array of shape (M, D) encoding indexed point positions.
+            radius: Maximum distance between paired points.
+            neighbors: Search engine, one of "merge", "grid" or "kdtree".
+            period: Side length of a periodic box [0, period) containing all points, if any.
+        Returns:
+            Spatial index to pass to _get_neighbor_pairs.
+        """
+        if neighbors == "kdtree":
+            return ss.cKDTree(data=positions, boxsize=period)
+        if neighbors == "grid":
+            return BoidSimulation._get_grid_index(positions=positions, size=radius, period=period)
+        if neighbors == "merge":
+            return BoidSimulation._get_grid_index(positions=positions, size=np.inf, period=period)
+        raise ValueError(f"Neighbors must be one of {BoidSimulation._neighbors}: {neighbors}")
+
+    @staticmethod
+    def _get_neighbor_pairs(
+        positions:np.ndarray,
+        radius:float,
+        neighbors:str="grid",
+        others:np.ndarray=None,
+        index:object=None,
+        period:float=None,
+        profiler:tp.Callable[[str], None]=None,
+    ) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Find all (center, neighbor) pairs of points within a radius of each other.
+
+        Arguments:
+            positions: Array of shape (N, D) encoding center point positions.
+            radius: Maximum distance between paired points.
+            neighbors: Search engine, one of "merge", "grid" or "kdtree".
+            others: Array of shape (M, D) encoding neighbor point positions.
+                If None, centers are paired with themselves.
+            index: Spatial index of the neighbor points, from _get_neighbor_index.
+                If None, built from the neighbor points.
+            period: Side length of a periodic box [0, period) containing all points, if any.
+                Points are then paired by their minimum-image distance.
+            profiler: Function called with "join" after candidate search and "filter" after filtering.
+        Returns:
+            Pair of integer arrays (i, j) indexing centers and neighbors, sorted by (i, j).
+            If centers are paired with themselves, every point is paired with itself.
+        """
+        pad = 1 + 1e-9
+        N = len(positions)
+        if others is None and neighbors == "kdtree":
+            # Query a KD-tree for unordered pairs, padding the radius against rounding.
+            tree = ss.cKDTree(data=positions, boxsize=period)
+            ij = tree.query_pairs(r=radius*pad, output_type="ndarray").reshape(-1, 2)
+            i = np.concatenate([ij[:, 0], ij[:, 1], np.arange(N)])
+            j = np.concatenate([ij[:, 1], ij[:, 0], np.arange(N)])
+        else:
+            if index is None:
+                index = BoidSimulation._get_neighbor_index(
+                    positions=positions if others is None else others,
+                    radius=radius,
+                    neighbors=neighbors,
+                    period=period,
+                )
+            if neighbors == "kdtree":
+                # Query a KD-tree of neighbors with a KD-tree of centers.
+                tree = ss.cKDTree(data=positions, boxsize=period)
+                ij = tree.sparse_distance_matrix(index, max_distance=radius*pad, output_type="ndarray")
+                i, j = ij["i"].astype(np.int64), ij["j"].astype(np.int64)
+            else:
+                i, j = BoidSimulation._query_grid_index(index=index, positions=positions)
+        if profiler:
+            profiler("join")
+
+        # Subset pairs to points within radius.
+        others = positions if others is None else others
+        translations = positions[i] - others[j]
+        if period is not None:
+            translations -= period * np.round(translations/period)
+        distances = np.sqrt(np.square(translations).sum(axis=1))
+        keep = distances <= radius
+        if others is positions:
+            keep |= i == j
+        i, j = i[keep], j[keep]
+
+        # Sort pairs by center, then neighbor.
+        order = np.lexsort((j, i))
+        i, j = i[order], j[order]
+        if profiler:
+            profiler("filter")
+        return i, j
+
+    @staticmethod
+    def _get_grid_cells(positions:np.ndarray, size:float, period:float=None) -> np.ndarray:
+        """
+        > Compute the integer grid cells of points, with a single cell for unbounded sizes.
+        In a periodic box, the period is divided into a whole number of cells no smaller than size.
+        """
+        if not size > 0:
+            raise ValueError(f"Grid cell size must be positive: {size}")
+        if period is not None:
+            n = BoidSimulation._get_grid_count(size=size, period=period)
+            return np.floor(positions*(n/period)).astype(np.int64).clip(0, n-1)
+        if not np.isfinite(size):
+            return np.zeros(positions.shape, dtype=np.int64)
+        return np.floor(positions/size).astype(np.int64)
+
+    @staticmethod
+    def _get_grid_count(size:float, period:float) -> int:
+        """
+        > Count the whole grid cells no smaller than size along a period, with at least one.
+        """
+        if not size > 0:
+            raise ValueError(f"Grid cell size must be positive: {size}")
+        if not np.isfinite(size):
+            return 1
+        return max(int(period//size), 1)
+
+    @staticmethod
+    def _get_grid_index(positions:np.ndarray, size:float, period:float=None) -> dict:
+        """
+        > Index points by the cells of a uniform grid.
+
+        Arguments:
+            positions: Array of shape (M, D) encoding point positions.
+            size: Side length of grid cells.
+            period: Side length of a periodic box [0, period) containing all points, if any.
+                Cells then wrap around the box.
+        Returns:
+            Dictionary encoding the grid geometry, points sorted by cell key and runs of occupied cells.
+        """
+        M, D = positions.shape
+        cells = BoidSimulation._get_grid_cells(positions=positions, size=size, period=period)
+
+        if period is not None:
+            # Encode each point's cell as an integer key, on a grid spanning the box.
+            origin = np.zeros(D, dtype=np.int64)
+            shape = np.full(D, BoidSimulation._get_grid_count(size=size, period=period), dtype=np.int64)
+        else:
+            # Encode each point's cell as an integer key, padding cells by one on every side.
+            origin = (cells.min(axis=0) if M else np.zeros(D, dtype=np.int64)) - 1
+            cells -= origin
+            shape = (cells.max(axis=0) if M else np.zeros(D, dtype=np.int64)) + 2
+        strides = np.cumprod(np.concatenate([[1], shape[:-1]])).astype(np.int64)
+        keys = cells @ strides
+
+        # Sort points by cell key, locating the run of points in each occupied cell.
+        order = np.argsort(keys, kind="stable")
+        cell_keys, cell_starts, cell_counts = np.unique(keys[order], return_index=True, return_counts=True)
+        return {
+            "size":size,
+            "period":period,
+            "origin":origin,
+            "shape":shape,
+            "strides":strides,
+            "order":order,
+            "cell_keys":cell_keys,
+            "cell_starts":cell_starts,
+            "cell_counts":cell_counts,
+        }
+
+    @staticmethod
+    def _query_grid_index(index:dict, positions:np.ndarray) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Pair points with indexed points lying in the same or adjacent grid cells.
+
+        Arguments:
+            index: Grid index from _get_grid_index.
+            positions: Array of shape (N, D) encoding query point positions.
+        Returns:
+            Pair of integer arrays (i, j) indexing query points and indexed points.
+        """
+        N, D = positions.shape
+        if not N or not len(index["cell_keys"]):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        cells = BoidSimulation._get_grid_cells(positions=positions, size=index["size"], period=index["period"])
+        cells -= index["origin"]
+
+        # Sort query points by cell key, so that offset keys are searched in order.
+        qorder = np.argsort(cells @ index["strides"], kind="stable")
+        cells = cells[qorder]
+
+        offsets = [-1, 0, +1]
+        if index["period"] is not None:
+            # Wrap offsets around the box, visiting each cell once when there are fewer than 3.
+            offsets = np.unique(np.mod(offsets, index["shape"][0])).tolist()
+
+        I, J = [], []
+        for offset in it.product(offsets, repeat=D):
+            # Locate the run of indexed points in each point's offset cell.
+            offset_cells = cells + offset
+            if index["period"] is not None:
+                offset_cells %= index["shape"]
+            inside = ((offset_cells >= 0) & (offset_cells < index["shape"])).all(axis=1)
+            offset_keys = offset_cells @ index["strides"]
+            u = np.searchsorted(index["cell_keys"], offset_keys).clip(max=len(index["cell_keys"])-1)
+            found = inside & (index["cell_keys"][u] == offset_keys)
+            lo = index["cell_starts"][u]
+            counts = np.where(found, index["cell_counts"][u], 0)
+            # Expand runs into pairs.
+            total = counts.sum()
+            starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            I.append(np.repeat(qorder, counts))
+            J.append(index["order"][starts + np.arange(total)])
+        i = np.concatenate(I)
+        j = np.concatenate(J)
+        return i, j
+
+    @staticmethod
+    def get_random_boids_state(
+        num_boids:int=100,
+        loc:float=0,
+        scale:float=1,
+        seed:int=None,
+        dims:int=2,
+    ) -> pd.DataFrame:
+        axes = BoidSimulation._axes[:dims]
+        rng = np.random if seed is None else np.random.default_rng(seed=seed)
+        data = rng.normal(size=(num_boids, dims), loc=loc, scale=scale)
+        state = pd.DataFrame(data=data, columns=[f"p{i}" for i in axes])
+        for i in axes:
+            state[f"v{i}"] = 0
         state["t"] = "boid"
         return state
 
@@ -209,9 +1068,274 @@ class BoidSimulation(object):
         state["t"] = "repulsor"
         return state
 
+    @staticmethod
+    def get_sphere_repulsor_state(num_repulsors:int=400, loc:float=0, radius:float=1) -> pd.DataFrame:
+        # Spread repulsors evenly over a spherical shell, along a Fibonacci lattice.
+        k = np.arange(num_repulsors) + 0.5
+        z = 1 - 2*k/num_repulsors
+        theta = 2*np.pi*k/constants.GOLDEN_RATIO
+        r = (1 - z**2)**0.5
+        state = pd.DataFrame({
+            "px":loc + radius*r*np.cos(theta),
+            "py":loc + radius*r*np.sin(theta),
+            "pz":loc + radius*z,
+        })
+        state["vx"] = 0
+        state["vy"] = 0
+        state["vz"] = 0
+        state["t"] = "repulsor"
+        return state
+
+####################################################################################################
+
+class BoidProfiler(object):
+
+    def __init__(self, callback:tp.Callable[[str, float, int], None]=None, memory:bool=False) -> object:
+        """
+        > Initialize a recorder of wall time, and optionally peak allocated bytes, per phase of Boid simulation steps.
+
+        Arguments:
+            callback: Optional function called as callback(phase, seconds, bytes) as each phase ends,
+                      with bytes None unless memory is traced.
+            memory: Whether to trace allocations, recording the peak bytes allocated within each phase.
+                    Tracing slows every allocation, inflating phase times.
+        Returns:
+            Function called with the name of each phase as it ends, accumulating stats per phase.
+        """
+        self.callback = callback
+        self.memory = memory
+        self.stats:tp.Dict[str, tp.Dict[str, float]] = {}
+        self._tracing:bool = False
+        self._time:float = 0
+        self._bytes:int = 0
+
+    def start(self) -> None:
+        """
+        > Start timing a step, tracing allocations if requested and not already traced elsewhere.
+        """
+        if self.memory:
+            self._tracing = not tracemalloc.is_tracing()
+            if self._tracing:
+                tracemalloc.start()
+            self._reset_peak()
+        self._time = timeit.default_timer()
+
+    def stop(self) -> None:
+        """
+        > Stop timing a step.
+        """
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def __call__(self, phase:str) -> None:
+        """
+        > Record the phase ending now, as starting when the previous phase ended.
+        Bytes are the peak of traced memory within the phase above that at its start,
+        so temporaries released within the phase are counted.
+        """
+        seconds = timeit.default_timer() - self._time
+        nbytes = max(0, tracemalloc.get_traced_memory()[1] - self._bytes) if self.memory else None
+        stats = self.stats.setdefault(phase, {"calls":0, "time":0.0, "bytes":None})
+        stats["calls"] += 1
+        stats["time"] += seconds
+        if nbytes is not None:
+            stats["bytes"] = max(stats["bytes"] or 0, nbytes)
+        if self.callback is not None:
+            self.callback(phase, seconds, nbytes)
+        if self.memory:
+            self._reset_peak()
+        self._time = timeit.default_timer()
+
+    def _reset_peak(self) -> None:
+        # Python 3.9+ resets the peak in place, otherwise restart tracing (if owned) to reset it.
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        elif self._tracing:
+            tracemalloc.stop()
+            tracemalloc.start()
+        self._bytes = tracemalloc.get_traced_memory()[0]
+
+####################################################################################################
+
+class BoidCache(object):
+
+    def __init__(self, maxsize:int=32, directory:str=None, disk_maxsize:int=256) -> object:
+        """
+        > Initialize a bounded least-recently-used cache of Boid simulation frames.
+
+        Arguments:
+            maxsize: Maximum number of runs held in memory.
+            directory: Optional directory to which runs are also written, shared across processes.
+            disk_maxsize: Maximum number of runs held in the directory.
+        Returns:
+            Cache mapping run keys to dictionaries of frame arrays.
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.disk_maxsize = disk_maxsize
+        self._runs:co.OrderedDict = co.OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key:tuple) -> tp.Optional[tp.Dict[str, np.ndarray]]:
+        """
+        > Return the cached frames of a run, or None if not cached.
+        """
+        with self._lock:
+            if key in self._runs:
+                self._runs.move_to_end(key)
+                return self._runs[key]
+        path = self._get_path(key=key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as npz:
+                frames = dict(npz)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Another process may be replacing or pruning the file.
+            return None
+        self._put_memory(key=key, frames=frames)
+        return frames
+
+    def put(self, key:tuple, frames:tp.Dict[str, np.ndarray], persist:bool=True) -> None:
+        """
+        > Cache the frames of a run, evicting the least-recently-used runs beyond capacity.
+
+        Arguments:
+            key: Run key.
+            frames: Dictionary of frame arrays of the run.
+            persist: Whether to also write the run to the directory. Files hold whole runs,
+                     so runs extended chunk by chunk are best written once complete.
+        """
+        self._put_memory(key=key, frames=frames)
+        path = self._get_path(key=key)
+        if path is None or not persist:
+            return
+        # Write atomically, then prune the least-recently-used files.
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as file:
+            np.savez(file, **frames)
+        os.replace(temp, path)
+        paths = sorted(glob.glob(os.path.join(self.directory, "*.npz")), key=os.path.getmtime)
+        for path in paths[:max(0, len(paths)-self.disk_maxsize)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _put_memory(self, key:tuple, frames:tp.Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            self._runs[key] = frames
+            self._runs.move_to_end(key)
+            while len(self._runs) > self.maxsize:
+                self._runs.popitem(last=False)
+
+    def _get_path(self, key:tuple) -> tp.Optional[str]:
+        if not self.directory:
+            return None
+        digest = hashlib.sha1(repr(tuple(key)).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.npz")
+
 ####################################################################################################
 # LAYOUT
 
+# Default streaming parameters.
+default_chunk = 10 # Number of frames computed per server call.
+default_tint = 1000 # Milliseconds between server calls.
+
+# Marker symbols of slow (|v|<1) and fast Boids, encoded by index.
+boids_symbols = ["circle", "x"]
+
+# Cache of computed runs, shared across processes through BOIDS_CACHE_DIR if set.
+boids_cache = BoidCache(maxsize=32, directory=os.environ.get("BOIDS_CACHE_DIR"))
+
+def get_boids_frames(sim:BoidSimulation, num:int=None) -> tp.Dict[str, np.ndarray]:
+    """
+    > Compute frames from the next iterations of a Boid simulation.
+
+    Arguments:
+        sim: Boid simulation to iterate.
+        num: Maximum number of frames, or None for all remaining iterations.
+    Returns:
+        Dictionary of "positions" and "velocities" arrays of shape (F, N, D).
+    """
+    positions, velocities = [], []
+    for _ in it.islice(it.count(), num):
+        try:
+            sim.advance()
+        except StopIteration:
+            break
+        positions.append(sim.positions)
+        velocities.append(sim.velocities)
+    F, (N, D) = len(positions), sim.positions.shape
+    return {
+        "positions":np.array(positions, dtype=np.float64).reshape(F, N, D),
+        "velocities":np.array(velocities, dtype=np.float64).reshape(F, N, D),
+    }
+
+def encode_boids_frames(frames:tp.Dict[str, np.ndarray], start:int=0) -> dict:
+    """
+    > Encode Boid frames compactly, for decoding client-side by dash_clientside.boids.decodeFrames.
+
+    Arguments:
+        frames: Dictionary of "positions" and "velocities" arrays of shape (F, N, D).
+        start: Name of the first frame.
+    Returns:
+        Dictionary of F frames of N Boids:
+            "x", "y", ...: Base64 little-endian float32 arrays of shape (F, N) encoding positions.
+            "symbol": Base64 uint8 array of shape (F, N) encoding indices into "symbols".
+    """
+    F, N, D = frames["positions"].shape
+    positions = frames["positions"].astype("<f4")
+    symbols = np.abs(frames["velocities"]).max(axis=2, initial=0) >= 1
+    return {
+        "start":start,
+        "frames":F,
+        "agents":N,
+        **{
+            i:encode_array(array=positions[:, :, k])
+            for k, i in enumerate(BoidSimulation._axes[:D])
+        },
+        "symbol":encode_array(array=symbols.astype(np.uint8)),
+        "symbols":boids_symbols,
+    }
+
+def get_boids_stats_markdown(stats:tp.Dict[str, tp.Dict[str, float]], steps:int) -> str:
+    """
+    > Format cumulative per-phase profiling stats of a Boid simulation as a markdown table.
+
+    Arguments:
+        stats: Dictionary of "time" (seconds) and peak "bytes" (or None) per phase, as BoidSimulation.stats.
+        steps: Number of profiled iterations.
+    Returns:
+        Markdown table of milliseconds per iteration, and peak kilobytes if traced, per phase.
+    """
+    if not stats or not steps:
+        return ""
+    memory = any(stat["bytes"] is not None for stat in stats.values())
+    rows = [
+        f"| {phase} | {1e3*stat['time']/steps:.2f} |" + (f" {(stat['bytes'] or 0)/1024:.0f} |" if memory else "")
+        for phase, stat in stats.items()
+    ]
+    total = sum(stat["time"] for stat in stats.values())
+    return "\n".join([
+        f"**Profile** ({steps} steps)",
+        "",
+        "| Phase | ms |" + (" Peak KB |" if memory else ""),
+        "|:--|--:|" + ("--:|" if memory else ""),
+        *rows,
+        f"| total | {1e3*total/steps:.2f} |" + (" |" if memory else ""),
+    ])
+
+def encode_array(array:np.ndarray) -> str:
+    """
+    > Encode an array's bytes (in C order) as a base64 string.
+    """
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+
 empty_boids_figure = {
     "data":[],
     "frames":[],
@@ -303,6 +1427,23 @@ app_layout = [
             """),
         ]),
     ]),
+    dcc.Interval(
+        id="interval-boids",
+        interval=default_tint,
+        disabled=True,
+    ),
+    dcc.Store(
+        id="store-boids",
+        data={},
+    ),
+    dcc.Store(
+        id="store-boids-frames",
+        data={},
+    ),
+    dcc.Store(
+        id="store-boids-played",
+        data=0,
+    ),
     dbc.Card([
         dbc.CardHeader([
             dbc.InputGroup(
@@ -315,6 +1456,25 @@ app_layout = [
                         color="primary",
                         disabled=False,
                     ),
+                    dbc.InputGroupText("Dimensions:"),
+                    dbc.Select(
+                        id="select-boids-dims",
+                        value=2,
+                        options=[
+                            {"value":dims, "label":f"{dims}D"}
+                            for dims in [2, 3]
+                        ],
+                    ),
+                    dbc.InputGroupText("Boundary:"),
+                    dbc.Select(
+                        id="select-boids-boundary",
+                        value="open",
+                        options=[
+                            {"value":"open", "label":"Repulsor ring"},
+                            {"value":"torus", "label":"Torus"},
+                            {"value":"walls", "label":"Walls"},
+                        ],
+                    ),
                     dbc.InputGroupText("Seperation:"),
                     dbc.Input(
                         id="input-boids-seperation",
@@ -327,12 +1487,23 @@ app_layout = [
             ),
         ]),
         dbc.CardBody([
-            dcc.Graph(
-                id="graph-boids-sim",
-                config={"displayModeBar":False, "displaylogo":False},
-                figure=empty_boids_figure,
-                style={"height":"80vh"},
-            ),
+            dbc.Row([
+                dbc.Col(width=10, children=[
+                    dcc.Graph(
+                        id="graph-boids-sim",
+                        config={"displayModeBar":False, "displaylogo":False},
+                        figure=empty_boids_figure,
+                        style={"height":"80vh"},
+                    ),
+                ]),
+                dbc.Col(width=2, children=[
+                    dcc.Markdown(
+                        id="markdown-boids-stats",
+                        children="",
+                        style={"fontSize":"small"},
+                    ),
+                ]),
+            ]),
         ]),
     ]),
 ]
@@ -353,12 +1524,33 @@ def register_app_callbacks(app:dash.Dash) -> None:
         return n_clicks + 1
 
     @app.callback(
-        ddp.Output("graph-boids-sim", "figure"),
-        [ddp.Input("button-boids-reset", "n_clicks")],
-        [ddp.State("graph-boids-sim", "figure")]
+        [
+            ddp.Output("graph-boids-sim", "figure"),
+            ddp.Output("store-boids-frames", "data"),
+            ddp.Output("store-boids", "data"),
+            ddp.Output("interval-boids", "disabled"),
+            ddp.Output("markdown-boids-stats", "children"),
+        ],
+        [
+            ddp.Input("button-boids-reset", "n_clicks"),
+            ddp.Input("interval-boids", "n_intervals"),
+        ],
+        [
+            ddp.State("select-boids-dims", "value"),
+            ddp.State("select-boids-boundary", "value"),
+            ddp.State("graph-boids-sim", "figure"),
+            ddp.State("store-boids", "data"),
+        ],
     )
-    def reset_graph(n_clicks:int, figure:dict) -> dict:
-        
+    def reset_graph(n_clicks:int, n_intervals:int, dims:int, boundary:str, figure:dict, data:dict) -> tuple:
+        trigger = dash.callback_context.triggered[0]
+        if trigger["prop_id"].endswith("n_intervals"):
+            if not data or data["n"] >= data["N"]:
+                return dash.no_update, dash.no_update, dash.no_update, True, dash.no_update
+            chunk, data = stream_frames(data=data)
+            markdown = get_boids_stats_markdown(stats=data["stats"], steps=data["profiled"])
+            return dash.no_update, chunk, data, data["n"] >= data["N"], markdown
+
         dt = 0.3
         duration = 1000*dt
 
@@ -366,56 +1558,157 @@ def register_app_callbacks(app:dash.Dash) -> None:
         diameters = map(lambda range:range[-1]-range[0], ranges)
         radius = 0.5*min(diameters)
 
-        initial_boids = BoidSimulation.get_random_boids_state(num_boids=50, scale=0.5)
-        initial_repulsors = BoidSimulation.get_circle_repulsor_state(num_repulsors=100, radius=radius)
+        dims = int(dims)
+        num_boids = 50
+        # Contain open flocks with a ring of repulsors, and bounded flocks with the arena.
+        num_repulsors = 0 if boundary != "open" else 100 if dims==2 else 400
+        seed = n_clicks
+        initial_boids = BoidSimulation.get_random_boids_state(num_boids=num_boids, scale=0.5, seed=seed, dims=dims)
+        if dims==2:
+            initial_repulsors = BoidSimulation.get_circle_repulsor_state(num_repulsors=num_repulsors, radius=radius)
+        else:
+            initial_repulsors = BoidSimulation.get_sphere_repulsor_state(num_repulsors=num_repulsors, radius=radius)
         initial_state = pd.concat(ignore_index=True, objs=[
             initial_boids,
             initial_repulsors,
         ])
 
+        params = {
+            "seperation":0.3,
+            "cohesion":0.6,
+            "alignment":0.01,
+            "visibility":3,
+            "boundary":boundary,
+            "arena":(-radius, radius),
+        }
         states = BoidSimulation(
             state=initial_state,
-            seperation=0.3,
-            cohesion=0.6,
-            alignment=0.01,
-            visibility=3,
+            engine="numpy",
+            neighbors="grid",
+            dims=dims,
+            **params,
         )
 
-        figure["frames"] = [
-            {
-                "name":n,
-                "data":[{
-                    "x":state["px"],
-                    "y":state["py"],
-                    "mode":"markers",
-                    "marker_symbol":np.where(
-                        state["vx"].abs().lt(1) & state["vy"].abs().lt(1),
-                        "circle",
-                        "x",
-                    ),
-                }],
-            }
-            for n, state in enumerate(states)
-        ]
-        figure["data"] = figure["frames"][0]["data"]
+        # Compute the first chunk of frames only, streaming the rest on interval.
+        data = {
+            "key":[
+                dims,
+                num_boids,
+                num_repulsors,
+                radius,
+                *(params[param] for param in ["seperation", "cohesion", "alignment", "visibility", "boundary"]),
+                states.step,
+                states.time,
+                seed,
+            ],
+            "params":params,
+            "dims":dims,
+            "step":states.step,
+            "duration":duration,
+            "n":0,
+            "N":int(states.time//states.step),
+            "state":states.state.to_dict(orient="list"),
+            "stats":{},
+            "profiled":0,
+        }
+        chunk, data = stream_frames(data=data)
+        figure["frames"] = []
+        figure["data"] = [{
+            "type":"scatter" if dims==2 else "scatter3d",
+            **{i:initial_state[f"p{i}"].tolist() for i in states._dims},
+            "mode":"markers",
+            "marker":{"size":6 if dims==2 else 3},
+        }]
+
+        # Show 3D Boids in a fixed cubic scene.
+        figure["layout"]["xaxis"]["visible"] = dims==2
+        figure["layout"]["yaxis"]["visible"] = dims==2
+        figure["layout"]["scene"] = {
+            "aspectmode":"cube",
+            **{
+                f"{i}axis":{"range":[-radius, radius], "autorange":False}
+                for i in BoidSimulation._axes
+            },
+        }
 
         button = figure["layout"]["updatemenus"][0]["buttons"][0]
         slider = figure["layout"]["sliders"][0]
         
+        button["args"][-1]["frame"]["redraw"] = dims==3
         button["args"][-1]["frame"]["duration"] = duration
         slider["transition"]["duration"] = duration
-        slider["step"] = [
-            {
-                "label": frame["name"],
-                "method": "animate",
-                "args": [
-                    [frame["name"]],
-                    {"frame": {"duration": duration, "redraw": False},
-                    "mode": "immediate",
-                    "transition": {"duration": duration}}
-                ],
+        markdown = get_boids_stats_markdown(stats=data["stats"], steps=data["profiled"])
+        return figure, chunk, data, data["n"] >= data["N"], markdown
+
+    def stream_frames(data:dict) -> tp.Tuple[dict, dict]:
+        key = tuple(data["key"])
+        n, N = data["n"], data["N"]
+        num = min(default_chunk, N-n)
+        cached = boids_cache.get(key=key)
+        num_cached = 0 if cached is None else len(cached["positions"])
+        if num_cached >= n+num:
+            # Serve the next chunk of frames from cache.
+            frames = {attr:array[n:n+num] for attr, array in cached.items()}
+        else:
+            # Serve any cached frames of the chunk, resuming the simulation from the last of them.
+            start = max(n, num_cached)
+            state = pd.DataFrame(data["state"])
+            if start > n:
+                for prefix, attr in [("p", "positions"), ("v", "velocities")]:
+                    for k, i in enumerate(BoidSimulation._axes[:data["dims"]]):
+                        state[f"{prefix}{i}"] = cached[attr][-1, :, k]
+            states = BoidSimulation(
+                state=state,
+                time=(N-start)*data["step"],
+                step=data["step"],
+                engine="numpy",
+                neighbors="grid",
+                dims=data["dims"],
+                profile=True,
+                **data["params"],
+            )
+            frames = get_boids_frames(sim=states, num=n+num-start)
+
+            # Accumulate per-phase profiling stats of computed (not cached) frames.
+            for phase, stat in states.stats.items():
+                total = data["stats"].setdefault(phase, {"calls":0, "time":0.0, "bytes":None})
+                total["calls"] += stat["calls"]
+                total["time"] += stat["time"]
+                if stat["bytes"] is not None:
+                    total["bytes"] = max(total["bytes"] or 0, stat["bytes"])
+            data["profiled"] += len(frames["positions"])
+            if start == num_cached:
+                # Extend the cached run with the new frames, writing it to disk once complete.
+                boids_cache.put(
+                    key=key,
+                    frames={
+                        attr:array if cached is None else np.concatenate([cached[attr], array])
+                        for attr, array in frames.items()
+                    },
+                    persist=start+len(frames["positions"])>=N,
+                )
+            if start > n:
+                frames = {
+                    attr:np.concatenate([cached[attr][n:], array])
+                    for attr, array in frames.items()
                 }
-            for frame in figure["frames"]
-        ]
-    
-        return figure
\ No newline at end of file
+
+        # Record the last frame as the resumable state.
+        for prefix, attr in [("p", "positions"), ("v", "velocities")]:
+            for k, i in enumerate(BoidSimulation._axes[:data["dims"]]):
+                data["state"][f"{prefix}{i}"] = frames[attr][-1, :, k].tolist()
+        data["n"] += len(frames["positions"])
+        chunk = encode_boids_frames(frames=frames, start=n)
+        chunk["duration"] = data["duration"]
+        chunk["redraw"] = data["dims"]==3
+        return chunk, data
+
+    app.clientside_callback(
+        ddp.ClientsideFunction(namespace="boids", function_name="extendFrames"),
+        ddp.Output("store-boids-played", "data"),
+        [ddp.Input("store-boids-frames", "data")],
+        [
+            ddp.State("graph-boids-sim", "id"),
+            ddp.State("store-boids-played", "data"),
+        ],
+    )
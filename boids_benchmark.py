@@ -0,0 +1,252 @@
+# Nicholas Eterovic 2021Q4
+####################################################################################################
+
+# Open-source packages.
+import os
+import sys
+import json
+import timeit
+import platform
+import datetime
+import subprocess
+import numpy as np
+import pandas as pd
+import typing as tp
+import itertools as it
+import multiprocessing as mp
+
+# In-house packages.
+import boids
+import utils.system as su
+
+####################################################################################################
+
+default_agents = [100, 1000, 5000, 20000]
+default_visibilities = [1, 3]
+default_repulsors = [0, 400]
+
+def run_case(
+    agents:int,
+    visibility:float,
+    repulsors:int,
+    steps:int=10,
+    engine:str="numpy",
+    neighbors:str="grid",
+    dims:int=2,
+    seed:int=0,
+) -> dict:
+    """
+    > Benchmark a Boid simulation of a given size, at a constant density of Boids.
+
+    Arguments:
+        agents: Number of Boids.
+        visibility: Radius in which a Boid perceives its neighbors.
+        repulsors: Number of static repulsors, on a circle (or sphere) around the Boids.
+        steps: Number of timed iterations, after one untimed warm-up iteration.
+        engine: Simulation engine, as in BoidSimulation.
+        neighbors: Neighbor search engine, as in BoidSimulation.
+        dims: Number of spatial dimensions, 2 or 3.
+        seed: Seed of initial Boid positions and velocities.
+    Returns:
+        Dictionary of case parameters, "steps_per_sec", "peak_rss" (bytes), "phases",
+        the mean seconds per iteration of each phase, timed separately with profiling,
+        and "phase_bytes", the peak bytes allocated within each phase, traced in a third run
+        (as tracing allocations slows them).
+    """
+    # Spread Boids at a constant density whatever their number, so that steps scale with agents.
+    scale = (agents/10)**(1/dims)
+    radius = 4*scale
+    objs = [boids.BoidSimulation.get_random_boids_state(num_boids=agents, scale=scale, seed=seed, dims=dims)]
+    if repulsors and dims == 2:
+        objs.append(boids.BoidSimulation.get_circle_repulsor_state(num_repulsors=repulsors, radius=radius))
+    elif repulsors:
+        objs.append(boids.BoidSimulation.get_sphere_repulsor_state(num_repulsors=repulsors, radius=radius))
+    state = pd.concat(objs=objs, ignore_index=True)
+    kwargs = {
+        "visibility":visibility,
+        "seperation":0.3,
+        "cohesion":0.6,
+        "alignment":0.01,
+        "time":steps+1,
+        "step":1,
+        "engine":engine,
+        "neighbors":neighbors,
+        "dims":dims,
+    }
+
+    # Time iterations without profiling overhead.
+    sim = boids.BoidSimulation(state=state.copy(), **kwargs)
+    sim.advance()
+    start = timeit.default_timer()
+    for _ in range(steps):
+        sim.advance()
+    seconds = timeit.default_timer() - start
+    # Sample the peak footprint before profiling and tracing add their own.
+    peak_rss = get_peak_rss()
+
+    # Time phases with profiling, without tracing allocations.
+    sim = boids.BoidSimulation(state=state.copy(), profile=True, **kwargs)
+    for _ in sim:
+        pass
+    phases = {phase:stat["time"]/stat["calls"] for phase, stat in sim.stats.items()}
+
+    # Trace allocations of phases.
+    sim = boids.BoidSimulation(state=state.copy(), profile_memory=True, **kwargs)
+    for _ in sim:
+        pass
+    phase_bytes = {phase:stat["bytes"] for phase, stat in sim.stats.items()}
+
+    return {
+        "agents":agents,
+        "visibility":visibility,
+        "repulsors":repulsors,
+        "engine":engine,
+        "neighbors":neighbors,
+        "dims":dims,
+        "steps":steps,
+        "steps_per_sec":steps/seconds if seconds > 0 else float("inf"),
+        "peak_rss":peak_rss,
+        "phases":phases,
+        "phase_bytes":phase_bytes,
+    }
+
+def get_peak_rss() -> tp.Optional[int]:
+    """
+    > Return the peak resident set size of the current process in bytes, or None if unsupported.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return rss if sys.platform == "darwin" else 1024*rss
+
+def _run_case(kwargs:dict) -> dict:
+    return run_case(**kwargs)
+
+def run_benchmark(
+    agents:tp.List[int]=default_agents,
+    visibilities:tp.List[float]=default_visibilities,
+    repulsors:tp.List[int]=default_repulsors,
+    **kwargs:dict,
+) -> tp.List[dict]:
+    """
+    > Benchmark Boid simulations over the product of agent counts, visibilities and repulsor counts.
+    Each case runs in a fresh process, so that its peak resident set size is its own.
+
+    Arguments:
+        agents: Numbers of Boids.
+        visibilities: Radii in which Boids perceive their neighbors.
+        repulsors: Numbers of static repulsors.
+        kwargs: Keyword arguments of run_case shared by all cases.
+    Returns:
+        List of run_case results, in order of cases.
+    """
+    cases = [
+        {"agents":a, "visibility":v, "repulsors":r, **kwargs}
+        for a, v, r in it.product(agents, visibilities, repulsors)
+    ]
+    results = []
+    with mp.get_context("spawn").Pool(processes=1, maxtasksperchild=1) as pool:
+        for result in pool.imap(_run_case, cases):
+            print(format_result(result=result), flush=True)
+            results.append(result)
+    return results
+
+def format_result(result:dict, baseline:dict=None) -> str:
+    """
+    > Format a benchmark result as a line of text, with its speedup over a baseline result if given.
+    """
+    rss = "n/a" if result["peak_rss"] is None else f"{result['peak_rss']/2**20:.0f}MB"
+    phases = " ".join(
+        f"{phase}={1e3*seconds:.2f}ms/{result.get('phase_bytes', {}).get(phase, 0)/2**10:.0f}KB"
+        for phase, seconds in result["phases"].items()
+    )
+    line = (
+        f"agents={result['agents']} visibility={result['visibility']} repulsors={result['repulsors']}"
+        f" | {result['steps_per_sec']:.2f} steps/sec, peak RSS {rss} | {phases}"
+    )
+    if baseline is not None:
+        line += f" | x{result['steps_per_sec']/baseline['steps_per_sec']:.2f} vs baseline"
+    return line
+
+def get_case_key(result:dict) -> tuple:
+    """
+    > Return the parameters identifying a benchmark case, for matching results across runs.
+    """
+    return tuple(result[param] for param in ["agents", "visibility", "repulsors", "engine", "neighbors", "dims", "steps"])
+
+def get_metadata() -> dict:
+    """
+    > Return a description of the benchmarked code and machine.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit":commit,
+        "timestamp":datetime.datetime.now().isoformat(timespec="seconds"),
+        "python":platform.python_version(),
+        "numpy":np.__version__,
+        "pandas":pd.__version__,
+        "platform":platform.platform(),
+        "processor":platform.processor(),
+        "cpus":os.cpu_count(),
+    }
+
+def main(
+    agents:str=",".join(map(str, default_agents)),
+    visibility:str=",".join(map(str, default_visibilities)),
+    repulsors:str=",".join(map(str, default_repulsors)),
+    steps:str="10",
+    engine:str="numpy",
+    neighbors:str="grid",
+    dims:str="2",
+    seed:str="0",
+    output:str="boids_benchmark.json",
+    baseline:str=None,
+) -> None:
+    """
+    > Run the Boid benchmark from command-line keyword arguments, writing results as JSON.
+
+    Example:
+        python boids_benchmark.py --agents=100,1000 --visibility=3 --repulsors=0 --output=new.json --baseline=old.json
+    Arguments:
+        agents, visibility, repulsors: Comma-separated values of each case parameter.
+        steps, engine, neighbors, dims, seed: Parameters shared by all cases, as in run_case.
+        output: Path of the JSON results, or None to skip writing.
+        baseline: Path of JSON results from a previous run (e.g. another commit), to compare against.
+    """
+    results = run_benchmark(
+        agents=[int(a) for a in agents.split(",")],
+        visibilities=[float(v) for v in visibility.split(",")],
+        repulsors=[int(r) for r in repulsors.split(",")],
+        steps=int(steps),
+        engine=engine,
+        neighbors=neighbors,
+        dims=int(dims),
+        seed=int(seed),
+    )
+    if output:
+        with open(output, "w") as file:
+            json.dump({"metadata":get_metadata(), "results":results}, file, indent=2)
+    if baseline:
+        with open(baseline) as file:
+            baselines = {get_case_key(result=result):result for result in json.load(file)["results"]}
+        print(f"Compared with {baseline}:")
+        for result in results:
+            print(format_result(result=result, baseline=baselines.get(get_case_key(result=result))))
+
+####################################################################################################
+
+if __name__ == "__main__":
+    kwargs = su.get_cli_kwargs()
+    main(**kwargs)
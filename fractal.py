@@ -3,6 +3,7 @@
 
 # Open-source packages.
 import json
+import base64
 import numpy as np
 import typing as tp
 import pandas as pd
@@ -24,6 +25,7 @@ class Fractal(object):
     
     # Class attributes.
     unit = pd.Series({"dx":1, "dy":0})
+    columns = ["x0", "y0", "x1", "y1"] # Order of segment coordinates in arrays.
     example_paths = {
         "seed":{
             "Horizontal Line":[
@@ -87,9 +89,9 @@ class Fractal(object):
         # Set public attributes.
         self.seed = seed
         self.generator = generator
-        # Set internal attributes.
-        self._seed = pd.DataFrame(self.seed)
-        self._generator = pd.DataFrame(self.generator)
+        # Set internal attributes, as arrays of segments and packed fractal bitmasks.
+        self._segments, self._mask = Fractal.get_segments(path=self.seed)
+        self._generator, self._generator_mask = Fractal.get_segments(path=self.generator)
         self._N:int = 1000
         self._n:int = 0
 
@@ -99,51 +101,223 @@ class Fractal(object):
     def __next__(self) -> pd.DataFrame:
         if self._n  >= self._N:
             raise StopIteration
-        interpolated_seed = Fractal.interpolate_seed(
-            seed=self._seed,
+        self._segments, self._mask = Fractal.interpolate_packed_segments(
+            segments=self._segments,
+            mask=self._mask,
             generator=self._generator,
+            generator_mask=self._generator_mask,
         )
-        self._seed = interpolated_seed
         self._n += 1
+        interpolated_seed = pd.DataFrame(self._segments, columns=Fractal.columns)
+        interpolated_seed["fractal"] = Fractal.unpack_mask(mask=self._mask, count=len(self._segments))
         return interpolated_seed
     
     @staticmethod
     def interpolate_seed(seed:pd.DataFrame, generator:pd.DataFrame) -> pd.DataFrame:
         if seed.empty or generator.empty:
             return seed
-        u = Fractal.unit
-        S = seed.copy()
-        
-        # Enrich seed line(s) properties.
-        S["dx"] = S["x1"] - S["x0"]
-        S["dy"] = S["y1"] - S["y0"]
-        S["length"] = S[["dx", "dy"]].pow(2).sum(axis=1).pow(0.5)
-        S["cross"] = np.where(np.cross(S[["dx", "dy"]], u)>0, -1, 1)
-        S["angle"] = S[["dx", "dy"]].dot(u).div(S["length"]).map(np.arccos).mul(S["cross"])
-
-        # Interpolate each seed line.
-        lines = []
-        for i, s in S.iterrows():
-            if not s["fractal"]:
-                # Do not interpolate non-fractal seed line.
-                line = s[seed.columns].to_frame().T
-            else:
-                # Rotate, rescale, and translate generator to interpolate seed line.
-                G = generator.copy()
-                R = Fractal._get_rotation_matrix(rads=s["angle"])
-                G[["x0", "y0"]] = G[["x0", "y0"]].dot(R.T).values * s["length"] + s[["x0", "y0"]].values
-                G[["x1", "y1"]] = G[["x1", "y1"]].dot(R.T).values * s["length"] + s[["x0", "y0"]].values                    
-                line = G[seed.columns]
-            lines.append(line)
-
-        interpolated_seed = pd.concat(lines)
-        return interpolated_seed
+        columns = Fractal.columns
+        segments, fractal = Fractal.interpolate_segments(
+            segments=seed[columns].to_numpy(dtype=float),
+            fractal=seed["fractal"].to_numpy(dtype=bool),
+            generator=generator[columns].to_numpy(dtype=float),
+            generator_fractal=generator["fractal"].to_numpy(dtype=bool),
+        )
+        interpolated_seed = pd.DataFrame(segments, columns=columns)
+        interpolated_seed["fractal"] = fractal
+        return interpolated_seed[seed.columns]
+
+    @staticmethod
+    def interpolate_segments(
+        segments:np.ndarray,
+        fractal:np.ndarray,
+        generator:np.ndarray,
+        generator_fractal:np.ndarray,
+    ) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Interpolate every fractal segment with a copy of the generator, transforming all copies at once.
+
+        Arguments:
+            segments: Array of shape (S, 4) of seed segments [x0, y0, x1, y1].
+            fractal: Boolean array of shape (S,), indicating seed segments to interpolate.
+                     Other (static) segments are kept as they are.
+            generator: Array of shape (G, 4) of generator segments [x0, y0, x1, y1],
+                       spanning the unit segment from (0, 0) to (1, 0).
+            generator_fractal: Boolean array of shape (G,), indicating fractal generator segments.
+
+        Returns:
+            Pair (segments, fractal) of arrays of shape (N, 4) and (N,), with N = S*G if all seed segments are fractal,
+            ordered as the seed segments they interpolate.
+        """
+        S, G = len(segments), len(generator)
+        if not S or not G:
+            return segments, fractal
+        # Map the unit segment onto each seed segment, rotating and rescaling by [[dx, -dy], [dy, dx]].
+        dx = segments[:, 2] - segments[:, 0]
+        dy = segments[:, 3] - segments[:, 1]
+        M = np.stack([np.stack([dx, -dy], axis=1), np.stack([dy, dx], axis=1)], axis=1)
+        # Transform both endpoints of every generator segment by every (S, 2, 2) matrix, then translate.
+        points = generator.reshape(G, 2, 2)
+        copies = np.einsum("sij,gpj->sgpi", M, points) + segments[:, None, None, :2]
+        copies = copies.reshape(S, G, 4)
+        # Keep static seed segments whole, in place of their first copy.
+        copies[~fractal, 0] = segments[~fractal]
+        keep = np.repeat(fractal[:, None], G, axis=1)
+        keep[:, 0] = True
+        flags = fractal[:, None] & generator_fractal[None, :]
+        return copies[keep], flags[keep]
+
+    @staticmethod
+    def interpolate_packed_segments(
+        segments:np.ndarray,
+        mask:np.ndarray,
+        generator:np.ndarray,
+        generator_mask:np.ndarray,
+    ) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Interpolate segments as by interpolate_segments, in the compact representation of get_segments.
+        """
+        segments, fractal = Fractal.interpolate_segments(
+            segments=segments.astype(np.float64),
+            fractal=Fractal.unpack_mask(mask=mask, count=len(segments)),
+            generator=generator.astype(np.float64),
+            generator_fractal=Fractal.unpack_mask(mask=generator_mask, count=len(generator)),
+        )
+        return segments.astype(np.float32), np.packbits(fractal)
+
+    @staticmethod
+    def get_lod_segments(
+        segments:np.ndarray,
+        mask:np.ndarray,
+        generator:np.ndarray,
+        generator_mask:np.ndarray,
+        n:int,
+        view:tp.Tuple[float, float, float, float]=None,
+        pixel:float=0.0,
+        max_segments:int=2**15,
+    ) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Interpolate segments up to n times, at the level of detail visible in a viewport.
+        Segments stop being interpolated once no longer than a pixel, or once no copy of the generator
+        interpolating them can reach the viewport, so that zooming in keeps a roughly constant number of segments.
+
+        Arguments:
+            segments, mask: Seed segments in the compact representation of get_segments.
+            generator, generator_mask: Generator segments in the compact representation of get_segments.
+            n: Maximum number of iterations.
+            view: Optional viewport (xmin, xmax, ymin, ymax), beyond which segments are not interpolated.
+            pixel: Size of a pixel in the viewport, at or below which segments are not interpolated.
+            max_segments: Maximum number of segments, beyond which further interpolation stops.
+
+        Returns:
+            Pair (segments, mask) in the compact representation of get_segments, with segments in no particular order.
+            Segments are kept as float64, precise enough for deep zooms.
+        """
+        segments = segments.astype(np.float64)
+        fractal = Fractal.unpack_mask(mask=mask, count=len(segments))
+        generator_fractal = Fractal.unpack_mask(mask=generator_mask, count=len(generator))
+        reach = Fractal._get_reach(generator=generator.astype(np.float64), generator_fractal=generator_fractal)
+        done_segments, done_fractal = [], []
+        for _ in range(n):
+            # Select fractal segments longer than a pixel, whose reach (a disk about their midpoint) meets the viewport.
+            dx = segments[:, 2] - segments[:, 0]
+            dy = segments[:, 3] - segments[:, 1]
+            lengths = np.hypot(dx, dy)
+            split = fractal & (lengths>pixel)
+            if view is not None and np.isfinite(reach):
+                xmin, xmax, ymin, ymax = view
+                mx = (segments[:, 0] + segments[:, 2])/2
+                my = (segments[:, 1] + segments[:, 3])/2
+                r = reach*lengths
+                split &= (mx+r>=xmin) & (mx-r<=xmax) & (my+r>=ymin) & (my-r<=ymax)
+            if not split.any():
+                break
+            if sum(map(len, done_segments)) + len(segments) + (len(generator)-1)*split.sum() > max_segments:
+                break
+            done_segments.append(segments[~split])
+            done_fractal.append(fractal[~split])
+            segments, fractal = Fractal.interpolate_segments(
+                segments=segments[split],
+                fractal=fractal[split],
+                generator=generator.astype(np.float64),
+                generator_fractal=generator_fractal,
+            )
+        segments = np.concatenate([*done_segments, segments])
+        return segments, np.packbits(np.concatenate([*done_fractal, fractal]))
+
+    @staticmethod
+    def _get_reach(generator:np.ndarray, generator_fractal:np.ndarray) -> float:
+        """
+        > Bound the distance from a segment's midpoint to all its interpolations, relative to its length.
+        Copies of the generator lie within c of the unit segment's midpoint, and shrink fractal segments by at most r,
+        so all interpolations lie within R = c/(1-r), which is infinite unless every fractal segment shrinks.
+        """
+        c = np.hypot(generator[:, [0, 2]] - 0.5, generator[:, [1, 3]]).max(initial=0.5)
+        r = np.hypot(generator[:, 2] - generator[:, 0], generator[:, 3] - generator[:, 1])[generator_fractal].max(initial=0)
+        if r>=1:
+            return np.inf
+        return max(0.5, c/(1-r))
+
+    @staticmethod
+    def get_segments(path:tp.List[dict]) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Convert a path of segment records to the compact representation of segments.
+
+        Arguments:
+            path: List of N dictionaries of segment coordinates "x0", "y0", "x1", "y1" and "fractal" indicators.
+
+        Returns:
+            Pair (segments, mask) of a float32 array of shape (N, 4) of coordinates [x0, y0, x1, y1]
+            and a uint8 array of the N fractal indicators packed as bits, by np.packbits.
+        """
+        segments = np.array([[line[c] for c in Fractal.columns] for line in path], dtype=np.float32).reshape(-1, 4)
+        mask = np.packbits(np.array([bool(line["fractal"]) for line in path], dtype=bool))
+        return segments, mask
 
     @staticmethod
-    def _get_rotation_matrix(rads:float=np.pi/2) -> np.ndarray:
-        cos, sin = np.cos(rads), np.sin(rads)
-        rotation_matrix = np.array([[+cos, -sin], [+sin, +cos]])
-        return rotation_matrix
+    def unpack_mask(mask:np.ndarray, count:int) -> np.ndarray:
+        """
+        > Unpack a bitmask of fractal indicators to a boolean array of shape (count,).
+        """
+        return np.unpackbits(mask, count=count).astype(bool)
+
+    @staticmethod
+    def encode_segments(segments:np.ndarray, mask:np.ndarray, origin:tp.Tuple[float, float]=None) -> dict:
+        """
+        > Encode segments compactly, for storing client-side and decoding by dash_clientside.fractal.
+
+        Arguments:
+            segments: Array of shape (N, 4) of coordinates [x0, y0, x1, y1].
+            mask: Uint8 array of the N fractal indicators packed as bits.
+            origin: Optional point (x, y), such as the center of the viewport, from which coordinates are encoded
+                    as float32 offsets. Offsets keep the precision of float32 relative to their distance from it,
+                    rather than to the coordinates, which is lost in deep zooms far from (0, 0).
+
+        Returns:
+            Dictionary of the number "count" of segments, base64 strings of the little-endian bytes of
+            "segments" and "mask", and the "origin" [x, y] of offsets.
+        """
+        origin = [0.0, 0.0] if origin is None else [float(origin[0]), float(origin[1])]
+        offsets = np.asarray(segments, dtype=np.float64) - np.tile(origin, 2)
+        return {
+            "count":len(segments),
+            "segments":base64.b64encode(np.ascontiguousarray(offsets, dtype="<f4").tobytes()).decode("ascii"),
+            "mask":base64.b64encode(np.ascontiguousarray(mask, dtype=np.uint8).tobytes()).decode("ascii"),
+            "origin":origin,
+        }
+
+    @staticmethod
+    def decode_segments(data:dict) -> tp.Tuple[np.ndarray, np.ndarray]:
+        """
+        > Decode segments encoded by encode_segments to a pair (segments, mask).
+        Segments are float32, unless encoded from an origin other than (0, 0), then float64.
+        """
+        segments = np.frombuffer(base64.b64decode(data["segments"]), dtype="<f4").reshape(-1, 4)
+        mask = np.frombuffer(base64.b64decode(data["mask"]), dtype=np.uint8)
+        origin = data.get("origin") or [0.0, 0.0]
+        if any(origin):
+            return segments + np.tile(np.array(origin, dtype=np.float64), 2), mask
+        return segments.astype(np.float32), mask
 
     @staticmethod
     def _get_path_from_figure(figure:dict) -> tp.List[dict]:
@@ -156,6 +330,11 @@ class Fractal(object):
 ####################################################################################################
 # LAYOUT
 
+# Level of detail of the fractal graph.
+default_max_depth = 24 # Maximum number of iterations.
+default_max_segments = 2**15 # Maximum number of plotted segments.
+default_pixels = 1000 # Assumed size of the graph in pixels, until its viewport is known.
+
 # Fractal construction lines.
 static_segment_datum = {
     "type":"scatter",
@@ -200,10 +379,30 @@ empty_path_figure = {
     },
 }
 
+def get_fractal_view(view:tp.Optional[dict], segments:np.ndarray) -> dict:
+    """
+    > Convert the viewport of the fractal graph to keyword arguments "view" and "pixel" of Fractal.get_lod_segments.
+
+    Arguments:
+        view: Viewport from dash_clientside.fractal.getView, of axis ranges "x" and "y", the size of the graph
+              in pixels "width" and "height" and an "autorange" indicator, or None if unknown or autoranged.
+        segments: Array of shape (N, 4) of seed segments, spanning the viewport if unknown.
+
+    Returns:
+        Dictionary of the viewport (xmin, xmax, ymin, ymax), or None if autoranged, and the size of a pixel in it.
+    """
+    if not view:
+        # Assume the seed spans the graph.
+        extent = np.ptp(segments.reshape(-1, 2), axis=0).max(initial=0) if len(segments) else 0
+        return {"view":None, "pixel":extent/default_pixels}
+    (xmin, xmax), (ymin, ymax) = sorted(view["x"]), sorted(view["y"])
+    pixel = max((xmax-xmin)/max(view["width"], 1), (ymax-ymin)/max(view["height"], 1))
+    return {"view":None if view["autorange"] else (xmin, xmax, ymin, ymax), "pixel":pixel}
+
 app_layout = [
     dbc.Card([
         dbc.CardBody([
-            dcc.Markdown("""
+            dcc.Markdown(f"""
                 # Self-Similar Fractals
                 ***
 
@@ -230,7 +429,8 @@ app_layout = [
                   custom-draw lines directly on the construction graphs.
 
                 Once a seed and generator pair is ready, click **Iterate** to get the next fractal iteration.
-                  Note that I have capped the number of line segments at 1000 (as it grows exponentially fast).
+                  Note that only segments which are visible and larger than a pixel get interpolated,
+                  so zoom in on the fractal to reveal its finer details (up to {default_max_depth} iterations).
 
                 Happy Fractalling!
             """),
@@ -314,7 +514,18 @@ app_layout = [
         ]),
         dcc.Store(
             id="store-fractal",
-            data={"seed":[], "generator":[], "n":0},
+            data={
+                "seed":Fractal.encode_segments(*Fractal.get_segments(path=[])),
+                "generator":Fractal.encode_segments(*Fractal.get_segments(path=[])),
+                "fractal":Fractal.encode_segments(*Fractal.get_segments(path=[])),
+                "n":0,
+                "revision":0,
+                "complete":False,
+            },
+        ),
+        dcc.Store(
+            id="store-fractal-view",
+            data=None,
         ),
         dbc.Col(width=6, children=[
             dbc.Card(style={"height":"100%"}, children=[
@@ -463,32 +674,61 @@ def register_app_callbacks(app:dash.Dash) -> None:
                 Y.extend([line["y0"], line["y1"], None])
             return states
 
+    app.clientside_callback(
+        ddp.ClientsideFunction(namespace="fractal", function_name="getView"),
+        ddp.Output("store-fractal-view", "data"),
+        [
+            ddp.Input("graph-fractal", "relayoutData"),
+            ddp.Input(f"graph-fractal-seed", "figure"),
+            ddp.Input(f"graph-fractal-generator", "figure"),
+        ],
+        [ddp.State("graph-fractal", "id")],
+    )
+
     @app.callback(
         ddp.Output(f"store-fractal", "data"),
         [
             ddp.Input(f"graph-fractal-seed", "figure"),
             ddp.Input(f"graph-fractal-generator", "figure"),
             ddp.Input("button-fractal-iterate", "n_clicks"),
+            ddp.Input("store-fractal-view", "data"),
         ],
         [ddp.State(f"store-fractal", "data")],
     )
-    def store_fractal(seed:dict, generator:dict, n_clicks:int, data:dict) -> dict:
+    def store_fractal(seed:dict, generator:dict, n_clicks:int, view:dict, data:dict) -> dict:
         trigger = dash.callback_context.triggered[0]
         if trigger["prop_id"].endswith("figure"):
-            # Reset seed and generator data on figure edit.
+            # Reset seed and generator data on figure edit, which autoranges the axes beyond the last view.
+            view = None
             for path, figure in (("seed", seed), ("generator", generator)):
-                data[path] = Fractal._get_path_from_figure(figure=figure)
+                segments, mask = Fractal.get_segments(path=Fractal._get_path_from_figure(figure=figure))
+                data[path] = Fractal.encode_segments(segments=segments, mask=mask)
             data["n"] = 0
-            return data
-        interpolated_seed = Fractal.interpolate_seed(
-            seed=pd.DataFrame(data["seed"]),
-            generator=pd.DataFrame(data["generator"]),
+            data["revision"] += 1
+        elif trigger["prop_id"].endswith("n_clicks"):
+            data["n"] = min(data["n"]+1, default_max_depth)
+
+        # Interpolate the seed at the level of detail of the viewport.
+        segments, mask = Fractal.decode_segments(data=data["seed"])
+        generator, generator_mask = Fractal.decode_segments(data=data["generator"])
+        lod = get_fractal_view(view=view, segments=segments)
+        segments, mask = Fractal.get_lod_segments(
+            segments=segments,
+            mask=mask,
+            generator=generator,
+            generator_mask=generator_mask,
+            n=data["n"],
+            max_segments=default_max_segments,
+            **lod,
         )
-        data["seed"] = interpolated_seed.to_dict(orient="records")
-        data["n"] += 1
+        # Encode coordinates from the center of the viewport, to keep their precision in deep zooms.
+        origin = None if lod["view"] is None else ((lod["view"][0]+lod["view"][1])/2, (lod["view"][2]+lod["view"][3])/2)
+        data["fractal"] = Fractal.encode_segments(segments=segments, mask=mask, origin=origin)
+        data["complete"] = data["n"]>=default_max_depth
         return data
 
-    @app.callback(
+    app.clientside_callback(
+        ddp.ClientsideFunction(namespace="fractal", function_name="plotSegments"),
         [
             ddp.Output("graph-fractal", "figure"),
             ddp.Output("button-fractal-iterate", "disabled"),
@@ -496,15 +736,3 @@ def register_app_callbacks(app:dash.Dash) -> None:
         [ddp.Input("store-fractal", "data")],
         [ddp.State(f"graph-fractal", "figure")],
     )
-    def plot_fractal(data:dict, figure:dict) -> dict:
-        n = data["n"]
-        lines = data["seed"]
-        for axis in ("x", "y"):
-            for j in (0, 1):
-                del figure["data"][j][axis][1:]
-        for line in lines:
-            j = int(line["fractal"])
-            figure["data"][j]["x"].extend([line["x0"], line["x1"], None])
-            figure["data"][j]["y"].extend([line["y0"], line["y1"], None])
-        figure["layout"]["title"] = f"Fractal Iteration #{n}"
-        return figure, len(lines)>1000
\ No newline at end of file
@@ -2,8 +2,20 @@
 ####################################################################################################
 
 # Open-source packages.
+import io
+import os
+import re
+import base64
+import uuid
+import ctypes
+import threading
+import weakref
+import numpy as np
 import typing as tp
 import itertools as it
+import collections as co
+import multiprocessing as mp
+import multiprocessing.pool as mpp
 
 # In-house imports.
 import constants
@@ -14,17 +26,53 @@ class GameOfLife(object):
 
     # Class attributes.
     _neighborhood:tp.List[tp.Tuple[int, int]] = list(it.product([-1, 0, +1], repeat=2))
-    _min_neighbors:int = 2 # Minimum # neighhors required for a live cell to live on.
-    _max_neighbors:int = 3 # Maximum # neighhors allowed for a live cell to live on.
-    _pop_neighbors:int = 3 # Required # neighhors required for a dead cell to populate.
+    _engines:tp.List[str] = ["python", "numpy", "hashlife", "sparse", "tiled"]
+    _rule:str = "B3/S23" # Conway's rule: live cells with 2 or 3 live neighbors survive, dead cells with 3 are born.
 
-    def __init__(self, state:tp.List[tp.Tuple[int, int]]=[], stop:int=100) -> object:
+    def __init__(
+        self,
+        state:tp.Union[tp.List[tp.Tuple[int, int]], np.ndarray]=[],
+        stop:int=100,
+        engine:str="python",
+        rule:str=_rule,
+        history:int=32,
+        bounds:tp.Tuple[int, int]=None,
+    ) -> object:
         """
         > Initialize an iterator that yields state evolutions from John Conway's game of life. 
         
         Arguments:
-            state: List-of-pairs [(x, y), ...], coordinates of initial live cells.
+            state: List-of-pairs [(x, y), ...], coordinates of initial live cells,
+                   or an integer array of shape (N, 2) of them, such as from GameOfLife.read_pattern.
+                   Arrays are validated at once rather than pair by pair.
             stop: Maximum number of allowed state evolutions.
+            engine: Evolution engine, one of:
+                "python": Sorted and grouped (neighbor, cell) pairs of live cells.
+                "numpy": Dense uint8 board spanning live cells, counting neighbors by shifted sums.
+                         The board is kept between evolutions, unless the state is reassigned.
+                "hashlife": Memoized quadtree of canonical nodes, fast-forwarding powers of 2 evolutions.
+                            Suited to advancing large, regular patterns far ahead.
+                "sparse": Set of live cells and map of live neighbor counts, updated by births and deaths.
+                          Only neighborhoods of cells changed by the last evolution are re-evaluated,
+                          so evolutions cost in proportion to activity rather than population.
+                          Evolutions return the set of live cells itself, updated in place by later evolutions;
+                          the state attribute lists them (in arbitrary order) only when read.
+                "tiled": Dense board split into tiles, evolved in parallel by a pool of processes over shared memory.
+                         Tiles whose neighborhood of tiles did not change are skipped.
+                         Suited to very large boards, on machines with several cores.
+                         Advances return an int64 array of shape (N, 2) of live cells, sorted by x then y;
+                         the state attribute and iteration list them only when read.
+            rule: Life-like rule "B<digits>/S<digits>", listing the numbers of live neighbors
+                  at which dead cells are born and live cells survive.
+                  For example, "B3/S23" (Conway), "B36/S23" (HighLife) or "B2/S" (Seeds).
+            history: Maximum number of recent states kept to detect cycles, such as still lifes and oscillators.
+                     States are hashed by XOR of their live cells' keys, updated by births and deaths where the engine
+                     tracks them ("sparse" and "tiled"), and kept as compact snapshots compared on equal hashes:
+                     packed bits of the board for the "numpy" and "tiled" engines, packed coordinates otherwise.
+                     Once a state recurs, its period is set and later evolutions are replayed from the cycle.
+                     With 0, states are not hashed and the hash attribute stays None.
+            bounds: Optional size (cols, rows) of a finite board spanning 0<=x<cols and 0<=y<rows,
+                    beyond which evolved cells die. Supported by the "python" and "numpy" engines.
 
         Returns:
             Iterable yielding state evolutions.
@@ -32,25 +80,85 @@ class GameOfLife(object):
         # Check types.
         if not isinstance(stop, int) or stop<0:
             raise ValueError(f"Max step must be a positive integer: {stop}")
-        if not isinstance(state, list):
+        if engine not in GameOfLife._engines:
+            raise ValueError(f"Engine must be one of {GameOfLife._engines}: {engine}")
+        if not isinstance(history, int) or history<0:
+            raise ValueError(f"History must be a non-negative integer: {history}")
+        if bounds is not None:
+            if engine not in ["python", "numpy"]:
+                raise ValueError(f"Bounds are only supported by the 'python' and 'numpy' engines: {engine}")
+            if len(bounds)!=2 or not all(isinstance(b, int) and b>=0 for b in bounds):
+                raise ValueError(f"Bounds must be a pair of non-negative integers (cols, rows): {bounds}")
+        table = GameOfLife._get_rule_table(rule=rule)
+        if isinstance(state, np.ndarray):
+            # Arrays are validated at once, then listed as pairs of Python integers.
+            cells = GameOfLife._check_cells(cells=state)
+            state = list(zip(cells[:, 0].tolist(), cells[:, 1].tolist()))
+        elif not isinstance(state, list):
             raise ValueError(f"State must be list: {state}")
-        for xy in state:
-            if not isinstance(xy, tuple):
-                raise ValueError(f"State elements must be integer 2-tuples {state}")
-            if len(xy) != 2:
-                raise ValueError(f"State elements must be integer 2-tuples {state}")
-            x, y = xy
-            if not isinstance(x, int) or not isinstance(y, int):
-                raise ValueError(f"State elements must be integer 2-tuples {state}")
+        else:
+            for xy in state:
+                if not isinstance(xy, tuple):
+                    raise ValueError(f"State elements must be integer 2-tuples {state}")
+                if len(xy) != 2:
+                    raise ValueError(f"State elements must be integer 2-tuples {state}")
+                x, y = xy
+                if not isinstance(x, int) or not isinstance(y, int):
+                    raise ValueError(f"State elements must be integer 2-tuples {state}")
         # Set attributes.
         self.state = state
         self.stop = stop
+        self.engine = engine
+        self.rule = rule
+        self.history = history
+        self.bounds = bounds
+        self.hash:int = None
+        self.period:int = None
         self._i = 0
+        self._table:np.ndarray = table
+        self._history:co.deque = co.deque(maxlen=history)
+        self._cycle:tp.List[tp.Tuple[int, tp.List[tp.Tuple[int, int]]]] = None
+        self._cycle_start:int = None
+        self._last_state:tp.List[tp.Tuple[int, int]] = None
+        self._board:np.ndarray = None
+        self._board_origin:tp.Tuple[int, int] = None
+        self._board_state:tp.List[tp.Tuple[int, int]] = None
+        self._hashlife:HashLife = HashLife(table=table) if engine=="hashlife" else None
+        self._root:object = None
+        self._root_state:tp.List[tp.Tuple[int, int]] = None
+        self._live:tp.Set[tp.Tuple[int, int]] = None
+        self._counts:tp.Dict[tp.Tuple[int, int], int] = None
+        self._changed:tp.Set[tp.Tuple[int, int]] = None
+        self._live_state:tp.List[tp.Tuple[int, int]] = None
+        self._tiled:TiledLife = None
+        self._tiled_state:tp.List[tp.Tuple[int, int]] = None
+        self._cells:np.ndarray = None
+
+    @property
+    def state(self) -> tp.List[tp.Tuple[int, int]]:
+        """
+        > List-of-pairs [(x, y), ...] coordinates of current live cells.
+        """
+        if self._state is None:
+            # List live cells on demand, from the cell array of the tiled engine or the set of the sparse engine.
+            if self._cells is not None:
+                self._state = list(zip(self._cells[:, 0].tolist(), self._cells[:, 1].tolist()))
+            else:
+                self._state = list(self._live)
+            self._last_state = self._state
+            self._live_state = self._state
+            self._tiled_state = self._state
+        return self._state
+
+    @state.setter
+    def state(self, state:tp.List[tp.Tuple[int, int]]) -> None:
+        self._state = state
+        self._cells = None
 
     def __iter__(self) -> object:
         return self
     
-    def __next__(self) -> tp.List[tp.Tuple[int, int]]:
+    def __next__(self) -> tp.Collection[tp.Tuple[int, int]]:
         """
         > Return the next state evolution.
         
@@ -58,17 +166,440 @@ class GameOfLife(object):
             None
 
         Returns:
-            List-of-pairs [(x, y), ...] coordinates of next live cells. 
+            List-of-pairs [(x, y), ...] coordinates of next live cells, or their set with the "sparse" engine. 
         """
         if self._i>=self.stop:
             raise StopIteration
-        state = GameOfLife._get_next_state(state=self.state)
-        self.state = state
-        self._i += 1
+        state = self.advance(n=1)
+        if self.engine=="tiled":
+            return self.state
         return state
 
+    def advance(self, n:int=1) -> tp.Collection[tp.Tuple[int, int]]:
+        """
+        > Advance the game by n evolutions at once, regardless of the maximum number of evolutions.
+        With the "hashlife" engine, repetitive patterns advance in time sub-linear in n.
+        
+        Arguments:
+            n: Number of evolutions.
+
+        Returns:
+            List-of-pairs [(x, y), ...] coordinates of live cells after n evolutions,
+            their set with the "sparse" engine (until a cycle is found),
+            or their int64 array of shape (N, 2) with the "tiled" engine.
+        """
+        if not isinstance(n, int) or n<0:
+            raise ValueError(f"Number of evolutions must be a non-negative integer: {n}")
+        if self._state is not self._last_state:
+            # Forget cycles and history of a reassigned state.
+            self.hash = GameOfLife._get_hash(state=self.state) if self.history else None
+            self.period = None
+            self._cycle = None
+            self._history.clear()
+            if self.history:
+                self._history.append((self._i, self.hash, None if self.engine=="sparse" else self._get_snapshot(state=self.state)))
+            self._last_state = self.state
+        if not n:
+            return self._get_cells() if self.engine=="tiled" else self.state
+        if self.period is not None:
+            # Replay the cycle, listing its states only when read.
+            self._i += n
+            self.hash, snapshot = self._cycle[(self._i - self._cycle_start) % self.period]
+            self.state = None
+            self._cells = GameOfLife._unpack_snapshot(snapshot=snapshot)
+            self._last_state = None
+            return self._cells if self.engine=="tiled" else self.state
+        if self.engine=="hashlife":
+            if self._root_state is not self.state:
+                # (Re)build the quadtree from a new state.
+                self._root = self._hashlife.get_node(state=self.state)
+            self._root = self._hashlife.advance(node=self._root, n=n)
+            cells = self._hashlife.get_cells(node=self._root)
+            state = list(zip(cells[:, 0].tolist(), cells[:, 1].tolist()))
+            self._root_state = state
+        elif self.engine=="tiled":
+            if self._state is not None and self._tiled_state is not self._state:
+                # (Re)build the tiled board from a new state.
+                if self._tiled is not None:
+                    self._tiled.close()
+                self._tiled = TiledLife(state=self.state, table=self._table)
+            h = self.hash
+            if self.history:
+                for _ in range(n):
+                    self._tiled.advance(n=1)
+                    # Update the hash by births and deaths, decoded from changed tiles only.
+                    h ^= GameOfLife._get_hash(state=self._tiled.get_changes())
+            else:
+                self._tiled.advance(n=n)
+            cells = self._tiled.get_cells()
+            # Leave live cells unlisted until the state is read.
+            state = None
+        elif self.engine=="sparse":
+            if self._state is not None and self._live_state is not self._state:
+                # (Re)build live cells and neighbor counts from a new state, all to be re-evaluated.
+                self._live = set(self.state)
+                self._counts = GameOfLife._get_neighbor_counts(cells=self._live)
+                self._changed = set(self._live)
+            h = self.hash
+            for _ in range(n):
+                self._changed = GameOfLife._evolve_cells(
+                    live=self._live,
+                    counts=self._counts,
+                    changed=self._changed,
+                    table=self._table,
+                )
+                if self.history:
+                    # Update the hash by births and deaths.
+                    h ^= GameOfLife._get_hash(state=self._changed)
+            # Leave live cells unlisted until the state is read.
+            state = None
+        elif self.engine=="numpy":
+            if self._board_state is not self.state:
+                # (Re)build the board from a new state.
+                self._board, self._board_origin = GameOfLife._get_board(state=self.state)
+            for _ in range(n):
+                self._board, self._board_origin = GameOfLife._get_next_board(
+                    board=self._board,
+                    origin=self._board_origin,
+                    table=self._table,
+                )
+                if self.bounds is not None:
+                    GameOfLife._clear_board(board=self._board, origin=self._board_origin, bounds=self.bounds)
+            cells = GameOfLife._get_board_cells(board=self._board, origin=self._board_origin)
+            state = list(zip(cells[:, 0].tolist(), cells[:, 1].tolist()))
+            self._board_state = state
+        else:
+            state = self.state
+            for _ in range(n):
+                state = GameOfLife._get_next_state(state=state, table=self._table)
+                if self.bounds is not None:
+                    cols, rows = self.bounds
+                    state = [(x, y) for x, y in state if 0<=x<cols and 0<=y<rows]
+            cells = state
+        if self.engine not in ["sparse", "tiled"]:
+            # Hash the engine's cells, only to detect cycles.
+            h = GameOfLife._get_hash(state=cells) if self.history else None
+        self.state = state
+        self._cells = cells if self.engine=="tiled" else None
+        self._i += n
+        self.hash = h
+        self._last_state = state
+        if self.history and self.engine!="sparse":
+            # Keep compact snapshots rather than states, compared on equal hashes.
+            snapshot = self._get_snapshot(state=None if self.engine in ["numpy", "tiled"] else cells)
+
+        if n>1:
+            # Cycles are only detected over consecutive evolutions.
+            self._history.clear()
+        elif self.engine=="sparse":
+            for i, hi, _ in self._history:
+                if hi!=h:
+                    continue
+                # Keep births and deaths rather than states, which recur when those since cancel out.
+                changes = [(j, changed) for j, _, changed in self._history if j>i] + [(self._i, self._changed)]
+                net = set()
+                for _, changed in changes:
+                    net ^= changed
+                if not net:
+                    # The state recurs: cache the cycle from its first occurrence, undoing changes from the last.
+                    self.period = self._i - i
+                    self._cycle_start = i
+                    live, snapshots = set(self._live), []
+                    for _, changed in reversed(changes):
+                        live ^= changed
+                        snapshots.insert(0, GameOfLife._pack_cells(cells=np.array(list(live), dtype=np.int64)))
+                    self._cycle = list(zip([hj for j, hj, _ in self._history if j>=i], snapshots))
+                    break
+        elif self.history:
+            for i, hi, snapshot_i in self._history:
+                if hi==h and snapshot_i==snapshot:
+                    # The state recurs: cache the cycle from its first occurrence.
+                    self.period = self._i - i
+                    self._cycle_start = i
+                    self._cycle = [(hj, snapshot_j) for j, hj, snapshot_j in self._history if j>=i]
+                    break
+        if self.engine=="sparse":
+            self._history.append((self._i, h, self._changed))
+            return self._live
+        if self.history:
+            self._history.append((self._i, h, snapshot))
+        return cells if self.engine=="tiled" else state
+
+    def _get_cells(self) -> np.ndarray:
+        """
+        > Return live cells as an int64 array of shape (N, 2), held from the engine or packed from the state.
+        """
+        if self._cells is None:
+            self._cells = np.array(self.state, dtype=np.int64).reshape(-1, 2)
+        return self._cells
+
+    def _get_snapshot(self, state:tp.Union[tp.List[tp.Tuple[int, int]], np.ndarray]=None) -> tp.Tuple[object, ...]:
+        """
+        > Copy live cells compactly, to confirm recurrences of equal hashes and replay cycles.
+        Dense engines pack the bits of a board, other engines the coordinates of live cells.
+
+        Arguments:
+            state: Live cells to copy, or None for the board of the "numpy" or "tiled" engine.
+
+        Returns:
+            Snapshot of _pack_board or _pack_cells.
+        """
+        if state is None and self.engine=="numpy":
+            return GameOfLife._pack_board(board=self._board, origin=self._board_origin)
+        if state is None:
+            return GameOfLife._pack_board(*self._tiled.get_board())
+        if self.engine in ["numpy", "tiled"]:
+            return GameOfLife._pack_board(*GameOfLife._get_board(state=state))
+        return GameOfLife._pack_cells(cells=np.array(state, dtype=np.int64))
+
     @staticmethod
-    def _get_next_state(state:tp.List[tp.Tuple[int, int]]) -> tp.List[tp.Tuple[int, int]]:
+    def _pack_board(board:np.ndarray, origin:tp.Tuple[int, int]) -> tp.Tuple[tp.Tuple[int, int], tp.Tuple[int, int], bytes]:
+        """
+        > Pack the live cells of a dense board indexed by [x, y] to (origin, shape, bits) of their bounding box,
+        equal for equal live cells, whatever the board's margins.
+        """
+        xs = np.flatnonzero(board.any(axis=1))
+        ys = np.flatnonzero(board.any(axis=0))
+        if not len(xs):
+            return (0, 0), (0, 0), b""
+        crop = board[xs[0]:xs[-1]+1, ys[0]:ys[-1]+1]
+        return (origin[0]+int(xs[0]), origin[1]+int(ys[0])), crop.shape, np.packbits(crop).tobytes()
+
+    @staticmethod
+    def _pack_cells(cells:np.ndarray) -> tp.Tuple[None, tp.Tuple[int, int], bytes]:
+        """
+        > Pack an int64 array of live cells to (None, shape, bytes) of their coordinates, sorted by x then y.
+        """
+        cells = cells.reshape(-1, 2)
+        cells = cells[np.lexsort((cells[:, 1], cells[:, 0]))]
+        return None, cells.shape, cells.tobytes()
+
+    @staticmethod
+    def _unpack_snapshot(snapshot:tp.Tuple[object, ...]) -> np.ndarray:
+        """
+        > Unpack a snapshot of _pack_board or _pack_cells to an int64 array of live cells, sorted by x then y.
+        """
+        origin, shape, data = snapshot
+        if origin is None:
+            return np.frombuffer(data, dtype=np.int64).reshape(shape).copy()
+        board = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=shape[0]*shape[1]).reshape(shape)
+        return GameOfLife._get_board_cells(board=board, origin=origin)
+
+    def read_pattern(path:tp.Union[str, tp.TextIO], chunk:int=2**16) -> tp.Tuple[np.ndarray, tp.Optional[str]]:
+        """
+        > Read the live cells of a pattern file in the RLE or Life 1.06 format, parsing chunks of lines at once.
+
+        Arguments:
+            path: Path of the pattern file, or a readable text file.
+                  Files starting with "#Life 1.06" list coordinates "x y" of a live cell per line.
+                  Other files are read as RLE: "#" comment lines, a header "x = m, y = n[, rule = r]",
+                  then runs "<count><tag>" of dead ("b" or ".") or live ("o") cells and row ends ("$"), ended by "!".
+            chunk: Number of lines parsed at once.
+
+        Returns:
+            Pair (cells, rule) of a C-contiguous int32 array of shape (N, 2), coordinates [(x, y), ...] of live cells,
+            and the rule "B<digits>/S<digits>" of the RLE header, or None.
+        """
+        if isinstance(path, str):
+            with open(path) as file:
+                return GameOfLife.read_pattern(path=file, chunk=chunk)
+        lines = iter(path)
+        first = next(lines, "")
+        if first.strip().lower().startswith("#life 1.06"):
+            return GameOfLife._read_life106(lines=lines, chunk=chunk), None
+        return GameOfLife._read_rle(lines=it.chain([first], lines), chunk=chunk)
+
+    @staticmethod
+    def from_pattern(path:tp.Union[str, tp.TextIO], **kwargs:dict) -> object:
+        """
+        > Initialize a game from a pattern file read by GameOfLife.read_pattern.
+
+        Arguments:
+            path: Path of the pattern file, or a readable text file.
+            kwargs: GameOfLife keyword arguments. The rule defaults to that of the RLE header, if any.
+
+        Returns:
+            Iterable yielding state evolutions of the pattern.
+        """
+        cells, rule = GameOfLife.read_pattern(path=path)
+        if rule is not None:
+            kwargs.setdefault("rule", rule)
+        return GameOfLife(state=cells, **kwargs)
+
+    @staticmethod
+    def _read_life106(lines:tp.Iterator[str], chunk:int) -> np.ndarray:
+        """
+        > Parse lines "x y" of live cell coordinates, skipping "#" comment lines and duplicate cells.
+        The digits of each chunk of lines are evaluated by place value with array operations.
+        """
+        blocks = []
+        for block in iter(lambda:list(it.islice(lines, chunk)), []):
+            text = "".join(block)
+            codes = np.frombuffer(text.encode() if text.endswith("\n") else f"{text}\n".encode(), dtype=np.uint8)
+
+            # Mask "#" comment lines.
+            is_newline = codes==ord("\n")
+            rows = np.cumsum(is_newline) - is_newline
+            starts = np.concatenate([[0], np.flatnonzero(is_newline)[:-1]+1])
+            is_comment = (codes[starts]==ord("#"))[rows]
+            is_digit = (codes>=ord("0")) & (codes<=ord("9")) & ~is_comment
+            is_minus = (codes==ord("-")) & ~is_comment
+            is_space = (codes==ord(" ")) | (codes==ord("\t")) | (codes==ord("\r")) | is_newline
+            if not (is_digit | is_minus | is_space | is_comment).all():
+                raise ValueError("Life 1.06 lines must be pairs of integer coordinates 'x y'")
+
+            # Delimit numbers, each an optional minus sign followed by digits.
+            is_number = is_digit | is_minus
+            edges = np.diff(np.concatenate([[False], is_number, [False]]).astype(np.int8))
+            starts, ends = np.flatnonzero(edges==1), np.flatnonzero(edges==-1)
+            signs = is_minus[starts]
+            lengths = ends - starts - signs
+            if len(starts) and (lengths.min()<1 or lengths.max()>18 or is_minus.sum()>signs.sum()):
+                raise ValueError("Life 1.06 lines must be pairs of integer coordinates 'x y'")
+            if not np.isin(np.bincount(rows[starts]), [0, 2]).all():
+                raise ValueError("Life 1.06 lines must be pairs of integer coordinates 'x y'")
+
+            # Evaluate numbers by place value.
+            digits = np.where(is_digit, codes.astype(np.int64)-ord("0"), 0)
+            values = np.zeros(len(starts), dtype=np.int64)
+            for k in range(lengths.max() if len(starts) else 0):
+                place = lengths>k
+                values[place] += digits[ends[place]-1-k] * 10**k
+            blocks.append(np.where(signs, -values, values).reshape(-1, 2))
+        cells = np.concatenate(blocks) if blocks else np.zeros((0, 2), dtype=np.int64)
+        cells = GameOfLife._check_cells(cells=cells)
+        # Drop duplicates, sorting cells packed as 64-bit keys.
+        keys = np.unique(cells.view(np.int64).ravel())
+        return np.ascontiguousarray(keys.view(np.int32).reshape(-1, 2))
+
+    @staticmethod
+    def _read_rle(lines:tp.Iterator[str], chunk:int) -> tp.Tuple[np.ndarray, tp.Optional[str]]:
+        """
+        > Parse an RLE pattern, decoding the runs of each chunk of lines with array operations.
+        The cursor (x, y) and any count split across chunks carry over to the next chunk.
+        """
+        rule, header, carry = None, False, b""
+        x0, y0 = 0, 0
+        blocks = []
+        for block in iter(lambda:list(it.islice(lines, chunk)), []):
+            runs = []
+            for line in block:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if not header:
+                    match = re.match(r"x\s*=\s*\d+\s*,\s*y\s*=\s*\d+(?:\s*,\s*rule\s*=\s*(\S+))?", line)
+                    if match is not None:
+                        header = True
+                        rule = GameOfLife._get_rule_name(rule=match.group(1))
+                        continue
+                header = True
+                runs.append(line)
+            text = carry + "".join(runs).replace(" ", "").encode()
+            end = text.find(b"!")
+            if end>=0:
+                text = text[:end]
+
+            # Split the text into tags and the digits of counts preceding them.
+            codes = np.frombuffer(text, dtype=np.uint8)
+            is_digit = (codes>=ord("0")) & (codes<=ord("9"))
+            tags = np.flatnonzero(~is_digit)
+            last = tags[-1]+1 if len(tags) else 0
+            carry = text[last:]
+            if len(carry)>18:
+                raise ValueError(f"RLE counts must be integers of at most 18 digits: {carry[:20]}")
+            codes, is_digit = codes[:last], is_digit[:last]
+            tag = codes[tags]
+            is_dead = (tag==ord("b")) | (tag==ord("."))
+            is_live = tag==ord("o")
+            is_row = tag==ord("$")
+            invalid = ~(is_dead | is_live | is_row)
+            if invalid.any():
+                raise ValueError(f"RLE tags must be one of 'b', '.', 'o', '$' or '!': {chr(tag[invalid][0])}")
+
+            # Evaluate counts by place value, defaulting to 1.
+            digits = np.where(is_digit, codes.astype(np.int64)-ord("0"), 0)
+            lengths = np.diff(np.concatenate([[-1], tags])) - 1
+            if len(tags) and lengths.max()>18:
+                raise ValueError("RLE counts must be integers of at most 18 digits")
+            counts = np.zeros(len(tags), dtype=np.int64)
+            for k in range(lengths.max() if len(tags) else 0):
+                place = lengths>k
+                counts[place] += digits[tags[place]-1-k] * 10**k
+            counts[lengths==0] = 1
+
+            # Locate runs: rows advance by row ends, columns by cells and reset on row ends.
+            steps = np.where(is_row, 0, counts)
+            ends = np.cumsum(steps)
+            bases = np.maximum.accumulate(np.where(is_row, ends, 0))
+            after_row = np.maximum.accumulate(is_row)
+            xs = ends - steps - bases + np.where(after_row, 0, x0)
+            ys = y0 + np.cumsum(np.where(is_row, counts, 0))
+            if len(tags):
+                x0 = int(ends[-1] - bases[-1] + (0 if after_row[-1] else x0))
+                y0 = int(ys[-1])
+
+            # Expand live runs to cells.
+            n = counts[is_live]
+            offsets = np.arange(n.sum()) - np.repeat(np.cumsum(n)-n, n)
+            blocks.append(np.stack([np.repeat(xs[is_live], n) + offsets, np.repeat(ys[is_live], n)], axis=1))
+            if end>=0:
+                break
+        cells = np.concatenate(blocks) if blocks else np.zeros((0, 2), dtype=np.int64)
+        return GameOfLife._check_cells(cells=cells), rule
+
+    @staticmethod
+    def _get_rule_name(rule:tp.Optional[str]) -> tp.Optional[str]:
+        """
+        > Normalize a rule of a pattern file to "B<digits>/S<digits>", converting "S/B" notation such as "23/3".
+        """
+        if rule is None:
+            return None
+        match = re.fullmatch(r"(\d*)/(\d*)", rule)
+        if match is not None:
+            return f"B{match.group(2)}/S{match.group(1)}"
+        return rule.upper()
+
+    @staticmethod
+    def _check_cells(cells:np.ndarray) -> np.ndarray:
+        """
+        > Validate an array of live cell coordinates at once, packing it as a C-contiguous int32 array of shape (N, 2).
+        Coordinates must fit 32 bits, as packed by _get_hash.
+        """
+        if cells.ndim!=2 or cells.shape[1]!=2:
+            raise ValueError(f"Cells must be an array of shape (N, 2): {cells.shape}")
+        if not np.issubdtype(cells.dtype, np.integer):
+            raise ValueError(f"Cells must be integer coordinates: {cells.dtype}")
+        bounds = np.iinfo(np.int32)
+        if len(cells) and (cells.min()<bounds.min or cells.max()>bounds.max):
+            raise ValueError(f"Cells must be 32-bit integer coordinates: {cells.min()} to {cells.max()}")
+        return np.ascontiguousarray(cells, dtype=np.int32)
+
+    @staticmethod
+    def _get_hash(state:tp.Union[tp.Iterable[tp.Tuple[int, int]], np.ndarray]) -> int:
+        """
+        > Hash live cells by XOR of 64-bit keys of their coordinates, so that hashes update by XOR of changed cells.
+        Keys are mixed from packed 32-bit coordinates by SplitMix64.
+        Cells may be given as an integer array of shape (N, 2), as decoded from boards.
+        """
+        if not isinstance(state, (np.ndarray, list)):
+            state = list(state)
+        xy = np.asarray(state, dtype=np.int64).reshape(-1, 2)
+        if not len(xy):
+            return 0
+        z = ((xy[:, 0].astype(np.uint64) & np.uint64(0xFFFFFFFF)) << np.uint64(32)) | (xy[:, 1].astype(np.uint64) & np.uint64(0xFFFFFFFF))
+        z = z + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+        return int(np.bitwise_xor.reduce(z))
+
+    @staticmethod
+    def _get_next_state(
+        state:tp.List[tp.Tuple[int, int]],
+        table:np.ndarray=None,
+    ) -> tp.List[tp.Tuple[int, int]]:
+        lives = GameOfLife._get_rule_lists(table=table)
         # Generate neighborhoods for candidate cells.
         neighborhoods = [
             ((x+dx, y+dy), (x, y))
@@ -84,35 +615,673 @@ class GameOfLife(object):
         state = [
             (x, y)
             for (x, y), num_neighbors, is_alive in cells
-            if GameOfLife._cell_lives(num_neighbors=num_neighbors, is_alive=is_alive)
+            if lives[is_alive][num_neighbors]
         ]
         return state
     
     @staticmethod
-    def _cell_lives(num_neighbors:int=0, is_alive:tp.Union[bool, int]=False) -> bool:
+    def _get_neighbor_counts(cells:tp.Iterable[tp.Tuple[int, int]]) -> tp.Dict[tp.Tuple[int, int], int]:
         """
-        > Determines if a cell becomes alive.
-        
+        > Count live neighbors of cells neighboring live cells, omitting zero counts.
+        """
+        counts = {}
+        for x, y in cells:
+            for dx, dy in GameOfLife._neighborhood:
+                if dx or dy:
+                    xy = (x+dx, y+dy)
+                    counts[xy] = counts.get(xy, 0) + 1
+        return counts
+
+    @staticmethod
+    def _evolve_cells(
+        live:tp.Set[tp.Tuple[int, int]],
+        counts:tp.Dict[tp.Tuple[int, int], int],
+        changed:tp.Set[tp.Tuple[int, int]],
+        table:np.ndarray=None,
+    ) -> tp.Set[tp.Tuple[int, int]]:
+        """
+        > Evolve live cells and their neighbor counts in place, re-evaluating neighborhoods of changed cells only.
+        Other cells keep their state and neighbor count, so they cannot change.
+
+        Arguments:
+            live: Set of live cells.
+            counts: Map of cells to their number of live neighbors, omitting zero counts.
+            changed: Set of cells born or killed by the last evolution.
+            table: Rule lookup table from _get_rule_table, Conway's by default.
+
+        Returns:
+            Set of cells born or killed by this evolution.
+        """
+        lives = GameOfLife._get_rule_lists(table=table)
+        # Re-evaluate changed cells and their neighbors.
+        candidates = {(x+dx, y+dy) for x, y in changed for dx, dy in GameOfLife._neighborhood}
+        births, deaths = [], []
+        for xy in candidates:
+            is_alive = xy in live
+            if lives[is_alive][counts.get(xy, 0)] != is_alive:
+                (deaths if is_alive else births).append(xy)
+        # Apply births and deaths, updating neighbor counts.
+        for cells, delta in [(births, +1), (deaths, -1)]:
+            for x, y in cells:
+                for dx, dy in GameOfLife._neighborhood:
+                    if dx or dy:
+                        xy = (x+dx, y+dy)
+                        count = counts.get(xy, 0) + delta
+                        if count:
+                            counts[xy] = count
+                        else:
+                            del counts[xy]
+        live.update(births)
+        live.difference_update(deaths)
+        return {*births, *deaths}
+
+    @staticmethod
+    def _get_board(state:tp.List[tp.Tuple[int, int]]) -> tp.Tuple[np.ndarray, tp.Tuple[int, int]]:
+        """
+        > Encode live cells as a dense board spanning them, with a margin of one dead cell.
+
+        Arguments:
+            state: List-of-pairs [(x, y), ...] coordinates of live cells.
+
+        Returns:
+            Pair (board, origin) of a uint8 array indexed by [x, y] and the coordinates of board[0, 0].
+        """
+        if not state:
+            return np.zeros((0, 0), dtype=np.uint8), (0, 0)
+        xy = np.array(state, dtype=np.int64).reshape(-1, 2)
+        origin = xy.min(axis=0) - 1
+        board = np.zeros(xy.max(axis=0) - origin + 2, dtype=np.uint8)
+        board[xy[:, 0]-origin[0], xy[:, 1]-origin[1]] = 1
+        return board, tuple(origin.tolist())
+
+    @staticmethod
+    def _get_board_state(board:np.ndarray, origin:tp.Tuple[int, int]) -> tp.List[tp.Tuple[int, int]]:
+        """
+        > Decode a dense board to coordinates of live cells, sorted as by _get_next_state.
+        """
+        cells = GameOfLife._get_board_cells(board=board, origin=origin)
+        return list(zip(cells[:, 0].tolist(), cells[:, 1].tolist()))
+
+    @staticmethod
+    def _get_board_cells(board:np.ndarray, origin:tp.Tuple[int, int]) -> np.ndarray:
+        """
+        > Decode a dense board to an int64 array of shape (N, 2), coordinates of live cells sorted by x then y.
+        """
+        cells = np.argwhere(board)
+        cells += origin
+        return cells
+
+    @staticmethod
+    def _get_next_board(
+        board:np.ndarray,
+        origin:tp.Tuple[int, int],
+        table:np.ndarray=None,
+    ) -> tp.Tuple[np.ndarray, tp.Tuple[int, int]]:
+        """
+        > Evolve a dense board, cropping it to the next live cells with a margin of one dead cell.
+
+        Arguments:
+            board: Uint8 array indexed by [x, y], with 1 encoding live cells.
+            origin: Coordinates of board[0, 0].
+            table: Rule lookup table from _get_rule_table, Conway's by default.
+
+        Returns:
+            Pair (board, origin) encoding the next live cells.
+        """
+        if not board.any():
+            return np.zeros((0, 0), dtype=np.uint8), (0, 0)
+        # Pad the board with a margin, in which cells may populate, and a dead frame beyond it.
+        X, Y = board.shape[0]+2, board.shape[1]+2
+        padded = np.pad(board, 2)
+        # Encode cells as 9*is_alive + num_neighbors, summing shifted windows of the board.
+        codes = 9*padded[1:1+X, 1:1+Y]
+        for dx, dy in GameOfLife._neighborhood:
+            if dx or dy:
+                codes += padded[1+dx:1+dx+X, 1+dy:1+dy+Y]
+        # Look up next cell states by code, in the flattened (is_alive, num_neighbors) table.
+        if table is None:
+            table = GameOfLife._get_rule_table(rule=GameOfLife._rule)
+        lives = np.take(table.ravel(), codes)
+        # Crop to live cells, with a margin of one dead cell.
+        xs = np.flatnonzero(lives.any(axis=1))
+        ys = np.flatnonzero(lives.any(axis=0))
+        if not len(xs):
+            return np.zeros((0, 0), dtype=np.uint8), (0, 0)
+        lives = np.pad(lives[xs[0]:xs[-1]+1, ys[0]:ys[-1]+1], 1)
+        origin = (origin[0] - 2 + int(xs[0]), origin[1] - 2 + int(ys[0]))
+        return lives.astype(np.uint8), origin
+
+    @staticmethod
+    def _clear_board(board:np.ndarray, origin:tp.Tuple[int, int], bounds:tp.Tuple[int, int]) -> None:
+        """
+        > Kill cells of a dense board indexed by [x, y] lying beyond bounds (cols, rows), in place.
+        """
+        (x0, y0), (cols, rows) = origin, bounds
+        board[:max(0, -x0)] = 0
+        board[max(0, cols-x0):] = 0
+        board[:, :max(0, -y0)] = 0
+        board[:, max(0, rows-y0):] = 0
+
+    @staticmethod
+    def _get_rule_table(rule:str) -> np.ndarray:
+        """
+        > Compile a Life-like rule string to a lookup table of next cell states.
+
+        Arguments:
+            rule: Rule "B<digits>/S<digits>", listing the numbers of live neighbors
+                  at which dead cells are born and live cells survive.
+
+        Returns:
+            Boolean array of shape (2, 9), indexed by [is_alive, num_neighbors].
+        """
+        match = re.fullmatch(r"B([0-8]*)/S([0-8]*)", str(rule).strip(), flags=re.IGNORECASE)
+        if match is None:
+            raise ValueError(f"Rule must be a string 'B<digits>/S<digits>' of neighbor counts 0-8: {rule}")
+        table = np.zeros((2, 9), dtype=bool)
+        for is_alive, digits in enumerate(match.groups()):
+            table[is_alive, [int(digit) for digit in digits]] = True
+        if table[0, 0]:
+            raise ValueError(f"Rule must not populate cells without live neighbors on an unbounded board: {rule}")
+        return table
+
+    @staticmethod
+    def _get_rule_lists(table:np.ndarray=None) -> tp.List[tp.List[bool]]:
+        """
+        > Convert a rule lookup table to nested lists, for fast lookups of single cells.
+        """
+        if table is None:
+            table = GameOfLife._get_rule_table(rule=GameOfLife._rule)
+        return table.tolist()
+
+####################################################################################################
+
+class HashLifeNode(object):
+
+    __slots__ = ["level", "a", "b", "c", "d", "population"]
+
+    def __init__(
+        self,
+        level:int,
+        a:object=None,
+        b:object=None,
+        c:object=None,
+        d:object=None,
+        population:int=0,
+    ) -> object:
+        """
+        > Initialize a quadtree node of a square of 2^level cells per side.
+        Nodes are canonical, so that equal squares are the same node, compared and hashed by identity.
+
+        Arguments:
+            level: Logarithm base 2 of the side length of the square, 0 for single cells.
+            a, b, c, d: Quadrant nodes at (low x, low y), (high x, low y), (low x, high y), (high x, high y).
+            population: Number of live cells in the square.
+
+        Returns:
+            Quadtree node.
+        """
+        self.level = level
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.population = population
+
+class HashLife(object):
+
+    # Single-cell nodes.
+    _dead:HashLifeNode = HashLifeNode(level=0, population=0)
+    _live:HashLifeNode = HashLifeNode(level=0, population=1)
+
+    def __init__(self, maxsize:int=2**20, table:np.ndarray=None) -> object:
+        """
+        > Initialize a HashLife evolver of canonical quadtree nodes, memoizing node evolutions.
+
+        Arguments:
+            maxsize: Maximum number of canonical nodes held between evolutions.
+                     Beyond it, nodes and memoized evolutions are dropped, except those of the current pattern.
+            table: Rule lookup table from GameOfLife._get_rule_table, Conway's by default.
+
+        Returns:
+            HashLife evolver.
+        """
+        self.maxsize = maxsize
+        self._lives:tp.List[tp.List[bool]] = GameOfLife._get_rule_lists(table=table)
+        self._nodes:tp.Dict[tuple, HashLifeNode] = {}
+        self._zeros:tp.List[HashLifeNode] = [HashLife._dead]
+        self._results:tp.Dict[tuple, HashLifeNode] = {}
+
+    def get_node(self, state:tp.List[tp.Tuple[int, int]]) -> HashLifeNode:
+        """
+        > Encode live cells as a quadtree centered on the origin, covering [-2^(level-1), 2^(level-1)).
+
+        Arguments:
+            state: List-of-pairs [(x, y), ...] coordinates of live cells.
+
+        Returns:
+            Root node.
+        """
+        extent = max((max(x, -x-1, y, -y-1) for x, y in state), default=0)
+        level = max(extent.bit_length()+1, 3)
+        half = 1 << (level-1)
+        # Merge nodes bottom-up, keyed by their position at each level.
+        nodes = {(x+half, y+half):HashLife._live for x, y in set(state)}
+        for k in range(level):
+            zero = self._get_zero(level=k)
+            quadrants = {}
+            for (x, y), node in nodes.items():
+                quadrants.setdefault((x>>1, y>>1), [zero]*4)[(x&1) + 2*(y&1)] = node
+            nodes = {xy:self._join(*abcd) for xy, abcd in quadrants.items()}
+        return nodes.get((0, 0), self._get_zero(level=level))
+
+    def get_state(self, node:HashLifeNode) -> tp.List[tp.Tuple[int, int]]:
+        """
+        > Decode a quadtree centered on the origin to sorted coordinates of live cells.
+        """
+        cells = self.get_cells(node=node)
+        return list(zip(cells[:, 0].tolist(), cells[:, 1].tolist()))
+
+    def get_cells(self, node:HashLifeNode) -> np.ndarray:
+        """
+        > Decode a quadtree centered on the origin to an int64 array of shape (N, 2), coordinates of live cells sorted by x then y.
+        """
+        state = []
+        half = 1 << (node.level-1) if node.level else 0
+        stack = [(node, -half, -half)]
+        while stack:
+            node, x, y = stack.pop()
+            if not node.population:
+                continue
+            if not node.level:
+                state.append((x, y))
+                continue
+            h = 1 << (node.level-1)
+            stack.extend([(node.a, x, y), (node.b, x+h, y), (node.c, x, y+h), (node.d, x+h, y+h)])
+        cells = np.array(state, dtype=np.int64).reshape(-1, 2)
+        return cells[np.lexsort((cells[:, 1], cells[:, 0]))]
+
+    def advance(self, node:HashLifeNode, n:int) -> HashLifeNode:
+        """
+        > Evolve a quadtree centered on the origin by n evolutions, one power of 2 per bit of n.
+
         Arguments:
-            num_neighbors: Number of neighboring live cells.
-            is_alive: Indicates if cell is currently alive.
+            node: Root node.
+            n: Number of evolutions.
 
         Returns:
-            Indicator if cell becomes alive.
-        """
-        if is_alive:
-            if num_neighbors<GameOfLife._min_neighbors:
-                # Under-population kills live cell.
-                return False
-            if num_neighbors>GameOfLife._max_neighbors:
-                # Over-population kills live cell.
-                return False
-            # Stable population maintains live cell.
-            return True
-        if num_neighbors==GameOfLife._pop_neighbors:
-            # Procreation populates dead cell.
-            return True
-        return False
+            Root node after n evolutions, centered on the origin.
+        """
+        j = 0
+        while n:
+            if n & 1:
+                # Pad the pattern into the central half of a square, allowing growth by 2^j cells per side.
+                while node.level < j+2 or not self._is_padded(node=node):
+                    node = self._get_centered(node=node)
+                node = self._get_successor(node=self._get_centered(node=node), j=j)
+                if len(self._nodes) > self.maxsize:
+                    node = self._collect(node=node)
+            n >>= 1
+            j += 1
+        return node
+
+    def _join(self, a:HashLifeNode, b:HashLifeNode, c:HashLifeNode, d:HashLifeNode) -> HashLifeNode:
+        """
+        > Return the canonical node of four quadrant nodes.
+        """
+        key = (a, b, c, d)
+        node = self._nodes.get(key)
+        if node is None:
+            population = a.population + b.population + c.population + d.population
+            node = HashLifeNode(level=a.level+1, a=a, b=b, c=c, d=d, population=population)
+            self._nodes[key] = node
+        return node
+
+    def _get_zero(self, level:int) -> HashLifeNode:
+        """
+        > Return the canonical node of a dead square.
+        """
+        while len(self._zeros) <= level:
+            zero = self._zeros[-1]
+            self._zeros.append(self._join(zero, zero, zero, zero))
+        return self._zeros[level]
+
+    def _get_centered(self, node:HashLifeNode) -> HashLifeNode:
+        """
+        > Return a node of twice the side length, with the given node at its center.
+        """
+        z = self._get_zero(level=node.level-1)
+        return self._join(
+            self._join(z, z, z, node.a),
+            self._join(z, z, node.b, z),
+            self._join(z, node.c, z, z),
+            self._join(node.d, z, z, z),
+        )
+
+    def _is_padded(self, node:HashLifeNode) -> bool:
+        """
+        > Indicate if all live cells of a node lie in its central half.
+        """
+        return node.level >= 2 and node.population == (
+            node.a.d.population + node.b.c.population + node.c.b.population + node.d.a.population
+        )
+
+    def _get_successor(self, node:HashLifeNode, j:int) -> HashLifeNode:
+        """
+        > Evolve the central half of a node (of level k) by 2^min(j, k-2) evolutions.
+        """
+        j = min(j, node.level-2)
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+        if not node.population:
+            result = node.a
+        elif node.level == 2:
+            result = self._get_base_successor(node=node)
+        else:
+            a, b, c, d = node.a, node.b, node.c, node.d
+            # Evolve nine overlapping sub-squares of half the side length.
+            n = [
+                self._get_successor(node=sub, j=j)
+                for sub in [
+                    a, self._join(a.b, b.a, a.d, b.c), b,
+                    self._join(a.c, a.d, c.a, c.b), self._join(a.d, b.c, c.b, d.a), self._join(b.c, b.d, d.a, d.b),
+                    c, self._join(c.b, d.a, c.d, d.c), d,
+                ]
+            ]
+            quadrants = [
+                (n[0], n[1], n[3], n[4]),
+                (n[1], n[2], n[4], n[5]),
+                (n[3], n[4], n[6], n[7]),
+                (n[4], n[5], n[7], n[8]),
+            ]
+            if j < node.level-2:
+                # Sub-squares already advanced 2^j evolutions: assemble their centers.
+                result = self._join(*(self._join(p.d, q.c, r.b, s.a) for p, q, r, s in quadrants))
+            else:
+                # Sub-squares advanced half way: advance their quadrants again.
+                result = self._join(*(self._get_successor(node=self._join(*q), j=j) for q in quadrants))
+        self._results[key] = result
+        return result
+
+    def _get_base_successor(self, node:HashLifeNode) -> HashLifeNode:
+        """
+        > Evolve the central 2x2 cells of a 4x4 node by one evolution.
+        """
+        cells = [[0]*4 for _ in range(4)]
+        for qx, qy, quadrant in [(0, 0, node.a), (1, 0, node.b), (0, 1, node.c), (1, 1, node.d)]:
+            for cx, cy, cell in [(0, 0, quadrant.a), (1, 0, quadrant.b), (0, 1, quadrant.c), (1, 1, quadrant.d)]:
+                cells[2*qx+cx][2*qy+cy] = cell.population
+        lives = [
+            HashLife._live if self._lives[cells[x][y]][
+                sum(cells[x+dx][y+dy] for dx, dy in GameOfLife._neighborhood) - cells[x][y]
+            ] else HashLife._dead
+            for y in (1, 2) for x in (1, 2)
+        ]
+        return self._join(*lives)
+
+    def _collect(self, node:HashLifeNode) -> HashLifeNode:
+        """
+        > Drop all canonical nodes and memoized evolutions, except the nodes of a pattern.
+        """
+        self._nodes = {}
+        self._zeros = [HashLife._dead]
+        self._results = {}
+        canonical = {HashLife._dead:HashLife._dead, HashLife._live:HashLife._live}
+        def recanonicalize(node:HashLifeNode) -> HashLifeNode:
+            if node not in canonical:
+                canonical[node] = self._join(*map(recanonicalize, (node.a, node.b, node.c, node.d)))
+            return canonical[node]
+        return recanonicalize(node)
+
+####################################################################################################
+
+class TiledLife(object):
+
+    def __init__(
+        self,
+        state:tp.List[tp.Tuple[int, int]],
+        table:np.ndarray=None,
+        tile:int=256,
+        processes:int=None,
+    ) -> object:
+        """
+        > Initialize an evolver of a dense board split into square tiles, advanced in parallel.
+        The board is double-buffered in shared memory, so that processes read and write tiles in place.
+        Tiles with no changed tile in their neighborhood are skipped, and hold the same cells in both buffers.
+        The board keeps a dead ring of tiles around live cells, growing when live cells reach it.
+
+        Arguments:
+            state: List-of-pairs [(x, y), ...] coordinates of initial live cells.
+            table: Rule lookup table from GameOfLife._get_rule_table, Conway's by default.
+            tile: Side length of tiles, in cells.
+            processes: Number of processes, the number of CPUs by default. With 1, tiles are evolved in-process.
+
+        Returns:
+            Tiled evolver.
+        """
+        if not isinstance(tile, int) or tile<1:
+            raise ValueError(f"Tile must be a positive integer: {tile}")
+        self.table = GameOfLife._get_rule_table(rule=GameOfLife._rule) if table is None else table
+        self.tile = tile
+        self.processes = processes or os.cpu_count() or 1
+        self._pool:mpp.Pool = None
+        self._finalizer:weakref.finalize = None
+
+        # Cover live cells with whole tiles, and a dead ring of tiles.
+        xy = np.array(state, dtype=np.int64).reshape(-1, 2)
+        low = xy.min(axis=0) if len(xy) else np.zeros(2, dtype=np.int64)
+        high = xy.max(axis=0) if len(xy) else np.zeros(2, dtype=np.int64)
+        tiles = (high - low)//tile + 3
+        self._origin:np.ndarray = low - tile
+        self._set_board(tiles=tuple(tiles.tolist()))
+        self._boards[0][xy[:, 0]-self._origin[0], xy[:, 1]-self._origin[1]] = 1
+        self._boards[1][...] = self._boards[0]
+        self._parity:int = 0
+        self._changed:np.ndarray = np.ones(self._tiles, dtype=bool)
+
+    def advance(self, n:int=1) -> None:
+        """
+        > Advance the board by n evolutions.
+        """
+        for _ in range(n):
+            # Evolve tiles with a changed tile in their neighborhood.
+            padded = np.pad(self._changed, 1)
+            X, Y = self._tiles
+            active = np.zeros(self._tiles, dtype=bool)
+            for dx, dy in GameOfLife._neighborhood:
+                active |= padded[1+dx:1+dx+X, 1+dy:1+dy+Y]
+            tasks = [(tx, ty, self._parity) for tx, ty in zip(*np.nonzero(active))]
+            if self.processes > 1 and len(tasks) > 1:
+                chunksize = max(1, len(tasks)//(4*self.processes))
+                flags = self._get_pool().map(_evolve_shared_tile, tasks, chunksize=chunksize)
+            else:
+                flags = [
+                    _evolve_tile(boards=self._boards, table=self.table, tile=self.tile, task=task)
+                    for task in tasks
+                ]
+            self._changed = np.zeros(self._tiles, dtype=bool)
+            alive = np.zeros(self._tiles, dtype=bool)
+            for (tx, ty, _), (changed, live) in zip(tasks, flags):
+                self._changed[tx, ty] = changed
+                alive[tx, ty] = live
+            self._parity = 1 - self._parity
+            # Grow the board by a ring of tiles once live cells reach the outer ring.
+            # Skipped tiles of the outer ring are dead, as they would have grown the board otherwise.
+            if alive[0].any() or alive[-1].any() or alive[:, 0].any() or alive[:, -1].any():
+                self._grow()
+
+    def get_state(self) -> tp.List[tp.Tuple[int, int]]:
+        """
+        > Decode the board to coordinates of live cells, sorted as by GameOfLife._get_next_state.
+        """
+        return GameOfLife._get_board_state(
+            board=self._boards[self._parity],
+            origin=tuple(self._origin.tolist()),
+        )
+
+    def get_cells(self) -> np.ndarray:
+        """
+        > Decode the board to an int64 array of shape (N, 2), coordinates of live cells sorted by x then y.
+        """
+        return GameOfLife._get_board_cells(
+            board=self._boards[self._parity],
+            origin=tuple(self._origin.tolist()),
+        )
+
+    def get_board(self) -> tp.Tuple[np.ndarray, tp.Tuple[int, int]]:
+        """
+        > Return the current buffer, a uint8 array indexed by [x, y], and the coordinates of its [0, 0].
+        """
+        return self._boards[self._parity], tuple(self._origin.tolist())
+
+    def get_changes(self) -> np.ndarray:
+        """
+        > Decode the cells changed by the last evolution to an int64 array of shape (N, 2),
+        comparing both buffers over changed tiles only.
+        """
+        current, previous = self._boards[self._parity], self._boards[1-self._parity]
+        changes = [np.zeros((0, 2), dtype=np.int64)]
+        for tx, ty in zip(*np.nonzero(self._changed)):
+            x0, y0 = tx*self.tile, ty*self.tile
+            xy = np.argwhere(current[x0:x0+self.tile, y0:y0+self.tile]!=previous[x0:x0+self.tile, y0:y0+self.tile])
+            changes.append(xy + self._origin + [x0, y0])
+        return np.concatenate(changes)
+
+    def close(self) -> None:
+        """
+        > Terminate the pool of processes, if any.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+        self._pool = None
+        self._finalizer = None
+
+    def _set_board(self, tiles:tp.Tuple[int, int]) -> None:
+        # Allocate both buffers in shared memory, replacing any pool attached to previous buffers.
+        self.close()
+        self._tiles:tp.Tuple[int, int] = tiles
+        self._shape:tp.Tuple[int, int] = (tiles[0]*self.tile, tiles[1]*self.tile)
+        self._buffers:tp.List[mp.RawArray] = [
+            mp.RawArray(ctypes.c_uint8, self._shape[0]*self._shape[1])
+            for _ in range(2)
+        ]
+        self._boards:tp.List[np.ndarray] = [
+            np.frombuffer(buffer, dtype=np.uint8).reshape(self._shape)
+            for buffer in self._buffers
+        ]
+
+    def _grow(self) -> None:
+        # Copy both buffers into the center of buffers with an extra ring of tiles, keeping the last changes.
+        boards = self._boards
+        changed = np.pad(self._changed, 1)
+        self._set_board(tiles=(self._tiles[0]+2, self._tiles[1]+2))
+        for new, board in zip(self._boards, boards):
+            new[self.tile:-self.tile, self.tile:-self.tile] = board
+        self._origin = self._origin - self.tile
+        self._changed = changed
+
+    def _get_pool(self) -> mpp.Pool:
+        if self._pool is None:
+            self._pool = mp.Pool(
+                processes=self.processes,
+                initializer=_init_shared_tiles,
+                initargs=(self._buffers, self._shape, self.table, self.tile),
+            )
+            self._finalizer = weakref.finalize(self, self._pool.terminate)
+        return self._pool
+
+def _evolve_tile(
+    boards:tp.List[np.ndarray],
+    table:np.ndarray,
+    tile:int,
+    task:tp.Tuple[int, int, int],
+) -> tp.Tuple[bool, bool]:
+    """
+    > Evolve a tile of a double-buffered board, reading its halo from the current buffer.
+
+    Arguments:
+        boards: Pair of uint8 arrays indexed by [x, y], alternating as current and next buffers.
+        table: Rule lookup table from GameOfLife._get_rule_table.
+        tile: Side length of tiles, in cells.
+        task: Triple (tx, ty, parity) of tile indices and the index of the current buffer.
+
+    Returns:
+        Pair (changed, alive) indicating if the tile changed, and if it has live cells.
+    """
+    tx, ty, parity = task
+    current, following = boards[parity], boards[1-parity]
+    X, Y = current.shape
+    x0, y0 = tx*tile, ty*tile
+    # Read the tile with a halo of one cell, dead beyond the board.
+    xlo, xhi, ylo, yhi = max(x0-1, 0), min(x0+tile+1, X), max(y0-1, 0), min(y0+tile+1, Y)
+    padded = np.pad(
+        current[xlo:xhi, ylo:yhi],
+        ((xlo-(x0-1), (x0+tile+1)-xhi), (ylo-(y0-1), (y0+tile+1)-yhi)),
+    )
+    # Encode cells as 9*is_alive + num_neighbors, and look up their next states.
+    codes = 9*padded[1:1+tile, 1:1+tile]
+    for dx, dy in GameOfLife._neighborhood:
+        if dx or dy:
+            codes += padded[1+dx:1+dx+tile, 1+dy:1+dy+tile]
+    lives = np.take(table.ravel().astype(np.uint8), codes)
+    following[x0:x0+tile, y0:y0+tile] = lives
+    return bool((lives != padded[1:1+tile, 1:1+tile]).any()), bool(lives.any())
+
+# Shared buffers of pool processes, set by _init_shared_tiles.
+_shared_tiles:dict = {}
+
+def _init_shared_tiles(
+    buffers:tp.List[mp.RawArray],
+    shape:tp.Tuple[int, int],
+    table:np.ndarray,
+    tile:int,
+) -> None:
+    _shared_tiles["boards"] = [np.frombuffer(buffer, dtype=np.uint8).reshape(shape) for buffer in buffers]
+    _shared_tiles["table"] = table
+    _shared_tiles["tile"] = tile
+
+def _evolve_shared_tile(task:tp.Tuple[int, int, int]) -> tp.Tuple[bool, bool]:
+    return _evolve_tile(task=task, **_shared_tiles)
+
+####################################################################################################
+
+class GameOfLifeSessions(object):
+
+    def __init__(self, maxsize:int=256) -> object:
+        """
+        > Initialize a bounded least-recently-used store of Game of Life boards, keyed by session id.
+        Boards live in the server process, so that clients exchange only changes to them.
+
+        Arguments:
+            maxsize: Maximum number of sessions held, beyond which the least-recently-used are dropped.
+        Returns:
+            Store mapping session ids to dictionaries of a "board", its "generation"
+            and the "game" evolving it, kept between server calls.
+        """
+        self.maxsize = maxsize
+        self._sessions:co.OrderedDict = co.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key:str) -> tp.Optional[tp.Dict[str, object]]:
+        """
+        > Return the board, generation and game of a session, or None if unknown or dropped.
+        """
+        with self._lock:
+            if key not in self._sessions:
+                return None
+            self._sessions.move_to_end(key)
+            return self._sessions[key]
+
+    def put(self, key:str, board:np.ndarray, generation:int, game:GameOfLife=None) -> None:
+        """
+        > Store the board, generation and game of a session, dropping the least-recently-used beyond capacity.
+        """
+        with self._lock:
+            self._sessions[key] = {"board":board, "generation":generation, "game":game}
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.maxsize:
+                self._sessions.popitem(last=False)
 
 ####################################################################################################
 # LAYOUT
@@ -128,6 +1297,13 @@ import dash_bootstrap_components as dbc
 default_rows = 25
 default_cols = 25
 default_tdur = 500
+default_batch = 10 # Number of generations computed per server call, played back client-side.
+default_rules = {
+    "B3/S23":"Conway",
+    "B36/S23":"HighLife",
+    "B2/S":"Seeds",
+    "B3678/S34678":"Day & Night",
+}
 
 # Heatmap visualizing the game of life.
 pause_info = "Click to Flip Cell State"
@@ -163,44 +1339,98 @@ default_figure = {
         "showscale":False,
         "autocolorscale":False,
         "colorscale":[[0, "whitesmoke"], [1, constants.NAVBAR_COLOR]],
-        **dict(zip(
-            ["x", "y", "z"],
-            zip(*it.product(range(default_cols), range(default_rows), [0])),
-        )),
+        "z":np.zeros((default_rows, default_cols), dtype=np.uint8),
     }],
 }
 
-app_layout = [
-    dbc.Card([
-        dbc.CardBody([
-            dcc.Markdown(f"""
-                # The Game of Life
-                ***
+def get_gol_board(z:tp.List[tp.List[int]], rows:int, cols:int) -> np.ndarray:
+    """
+    > Decode a heatmap matrix to a board of live cells, cropped or padded to the given shape.
 
-                ### Introduction
-                ***
+    Arguments:
+        z: Matrix of cell states indexed by [y][x], with 1 encoding live cells.
+        rows: Number of rows (y) of the board.
+        cols: Number of columns (x) of the board.
 
-                  This project is an implementation of 
-                  [Conway's Game of Life](https://en.wikipedia.org/wiki/Conway%27s_Game_of_Life),
-                  a population simulation governed by a small set of rules:
+    Returns:
+        Uint8 array of shape (rows, cols) indexed by [y, x].
+    """
+    z = np.atleast_2d(np.array(z, dtype=np.uint8))
+    board = np.zeros((rows, cols), dtype=np.uint8)
+    r, c = min(rows, z.shape[0]), min(cols, z.shape[1])
+    board[:r, :c] = z[:r, :c]
+    return board
 
-                1. *Any live cell with {GameOfLife._min_neighbors} or {GameOfLife._max_neighbors} live neighbours survives.*
-                2. *Any dead cell with {GameOfLife._pop_neighbors} live neighbours becomes a live cell.*
-                2. *All other live cells die in the next generation. Similarly, all other dead cells stay dead.*
+def get_gol_cells(board:np.ndarray) -> tp.List[tp.Tuple[int, int]]:
+    """
+    > Decode a board indexed by [y, x] to coordinates [(x, y), ...] of live cells.
+    """
+    y, x = np.nonzero(board)
+    return list(zip(x.tolist(), y.tolist()))
 
-                The neighborhood of a cell comprises the eight adjacent cells.
-            """),
+def set_gol_cells(cells:tp.List[tp.Tuple[int, int]], rows:int, cols:int) -> np.ndarray:
+    """
+    > Encode coordinates [(x, y), ...] of live cells as a board indexed by [y, x], dropping cells outside it.
+    """
+    board = np.zeros((rows, cols), dtype=np.uint8)
+    xy = np.array(cells, dtype=np.int64).reshape(-1, 2)
+    inside = (xy[:, 0]>=0) & (xy[:, 0]<cols) & (xy[:, 1]>=0) & (xy[:, 1]<rows)
+    board[xy[inside, 1], xy[inside, 0]] = 1
+    return board
+
+def get_gol_intro(rule:str) -> str:
+    """
+    > Describe the game of life under a Life-like rule "B<digits>/S<digits>", listing its neighbor counts.
+    """
+    table = GameOfLife._get_rule_table(rule=rule)
+    births, survivals = (np.flatnonzero(table[k]).tolist() for k in [0, 1])
+    counts = lambda ks: " or ".join(filter(None, [", ".join(map(str, ks[:-1])), str(ks[-1])]))
+    survive = f"Any live cell with {counts(survivals)} live neighbours survives." if survivals else "No live cell survives."
+    birth = f"Any dead cell with {counts(births)} live neighbours becomes a live cell." if births else "No dead cell becomes a live cell."
+    name = default_rules.get(rule, "Custom")
+    return f"""
+        # The Game of Life
+        ***
+
+        ### Introduction
+        ***
+
+          This project is an implementation of 
+          [Conway's Game of Life](https://en.wikipedia.org/wiki/Conway%27s_Game_of_Life),
+          a population simulation governed by a small set of rules, here {name} ({rule}):
+
+        1. *{survive}*
+        2. *{birth}*
+        3. *All other live cells die in the next generation. Similarly, all other dead cells stay dead.*
+
+        The neighborhood of a cell comprises the eight adjacent cells.
+    """
+
+# Boards of client sessions, held by the (single) server process.
+gol_sessions = GameOfLifeSessions(maxsize=256)
+
+app_layout = [
+    dbc.Card([
+        dbc.CardBody([
+            dcc.Markdown(
+                id="markdown-gol-intro",
+                children=get_gol_intro(rule=GameOfLife._rule),
+            ),
         ]),
     ]),
     dcc.Interval(
         id="interval-gol",
-        interval=100,
+        interval=default_tdur*default_batch,
         disabled=True,
     ),
     dcc.Store(
         id="store-gol",
         data={},
     ),
+    dcc.Store(
+        id="store-gol-delta",
+        data={},
+    ),
     dbc.Card([
         dbc.CardHeader([
             dcc.Markdown("""
@@ -217,13 +1447,22 @@ app_layout = [
                         color="primary",
                         disabled=False,
                     ),
+                    dcc.Upload(
+                        id="upload-gol-pattern",
+                        accept=".rle,.lif,.life,.txt",
+                        children=dbc.Button(
+                            children="Load Pattern",
+                            color="primary",
+                            className="rounded-0",
+                        ),
+                    ),
                     dbc.InputGroupText("Rows:"),
                     dbc.Select(
                         id="select-gol-rows",
                         value=default_rows,
                         options = [
                             {"value":dim, "label":dim}
-                            for dim in [10, 25, 50, 75, 100]
+                            for dim in [10, 25, 50, 75, 100, 250, 500]
                         ]
                     ),
                     dbc.InputGroupText("Cols:"),
@@ -232,7 +1471,16 @@ app_layout = [
                         value=default_cols,
                         options = [
                             {"value":dim, "label":dim}
-                            for dim in [10, 25, 50, 75, 100]
+                            for dim in [10, 25, 50, 75, 100, 250, 500]
+                        ]
+                    ),
+                    dbc.InputGroupText("Rule:"),
+                    dbc.Select(
+                        id="select-gol-rule",
+                        value=GameOfLife._rule,
+                        options = [
+                            {"value":rule, "label":f"{name} ({rule})"}
+                            for rule, name in default_rules.items()
                         ]
                     ),
                     dbc.InputGroupText("Duration:"),
@@ -240,8 +1488,17 @@ app_layout = [
                         id="select-gol-tdur",
                         value=default_tdur,
                         options = [
-                            {"value":dur, "label":f"{dur/1000:.1f}S"}
-                            for dur in [100, 300, 500, 1000]
+                            {"value":dur, "label":f"{dur}ms"}
+                            for dur in [20, 50, 100, 300, 500, 1000]
+                        ]
+                    ),
+                    dbc.InputGroupText("Batch:"),
+                    dbc.Select(
+                        id="select-gol-batch",
+                        value=default_batch,
+                        options = [
+                            {"value":batch, "label":f"{batch} Gen"}
+                            for batch in [1, 5, 10, 25, 50]
                         ]
                     ),
                     dbc.Button(
@@ -316,31 +1573,53 @@ def register_app_callbacks(app:dash.Dash) -> None:
         if trigger["prop_id"].endswith("n_clicks") and states[0]=="Play" and tab=="gol":
             return "Pause", "warning", False, None, dbc.Spinner(size="sm"), "warning", False
         return "Play", "primary", False, "fa fa-play", None, "primary", True
-        
+
+    @app.callback(
+        ddp.Output("markdown-gol-intro", "children"),
+        [ddp.Input("select-gol-rule", "value")],
+    )
+    def set_intro(rule:str) -> str:
+        # Describe the neighbor counts of the selected rule.
+        if not rule:
+            raise dex.PreventUpdate
+        return get_gol_intro(rule=rule)
+
     @app.callback(
+        ddp.Output("interval-gol", "interval"),
         [
-            ddp.Output("graph-gol", "figure"),
-            ddp.Output("graph-gol", "config"),
+            ddp.Input("select-gol-tdur", "value"),
+            ddp.Input("select-gol-batch", "value"),
         ],
+    )
+    def set_interval(tdur:int, batch:int) -> int:
+        # Call the server once per batch of generations, played back client-side.
+        if not tdur or not batch:
+            raise dex.PreventUpdate
+        return int(tdur)*int(batch)
+
+    @app.callback(
+        ddp.Output("store-gol-delta", "data"),
         [
             ddp.Input("button-gol-clear", "n_clicks"),
+            ddp.Input("upload-gol-pattern", "contents"),
             ddp.Input("interval-gol", "n_intervals"),
             ddp.Input("interval-gol", "disabled"),
             ddp.Input("graph-gol", "clickData"),
             ddp.Input("graph-gol", "selectedData"),
+            ddp.Input("select-gol-cols", "value"),
+            ddp.Input("select-gol-rows", "value"),
         ],
         [
-            ddp.State("select-gol-cols", "value"),
-            ddp.State("select-gol-rows", "value"),
             ddp.State("select-gol-tdur", "value"),
+            ddp.State("select-gol-batch", "value"),
+            ddp.State("select-gol-rule", "value"),
             ddp.State("button-gol-state", "children"),
-            ddp.State("graph-gol", "figure"),
-            ddp.State("graph-gol", "config"),
-            ddp.State("graph-gol", "loading_state"),
+            ddp.State("store-gol", "data"),
         ],
     )
     def plot_gol(
         n_clicks:int,
+        contents:str,
         n_intervals:int,
         disabled:bool,
         clickData:dict,
@@ -348,66 +1627,112 @@ def register_app_callbacks(app:dash.Dash) -> None:
         cols:int,
         rows:int,
         tdur:int,
+        batch:int,
+        rule:str,
         state:str,
-        figure:dict,
-        config:dict,
-        loading_state:bool,
-    ) -> tp.Tuple[dict, dict]:
+        data:dict,
+    ) -> dict:
         trigger = dash.callback_context.triggered[0]
-        if trigger["prop_id"].endswith("n_intervals"):
-            # Throttle interval updates.
-            tdur = int(tdur)
-            n_intervals = int(n_intervals)
-            if (100*n_intervals)%tdur:
-                raise dex.PreventUpdate
 
-        # Extract state.
+        # Extract the session board, resending it whole if the client is out of sync.
         cols = int(cols)
         rows = int(rows)
-        datum = figure["data"][0]
+        data = data or {}
+        key = data.get("session") or uuid.uuid4().hex
+        session = gol_sessions.get(key=key)
+        if session is None and "cells" in data:
+            # Rebuild a dropped session from the live cells held by the client.
+            z = np.zeros(int(data["rows"])*int(data["cols"]), dtype=np.uint8)
+            cells = np.array(data["cells"], dtype=np.int64)
+            z[cells[(cells>=0) & (cells<len(z))]] = 1
+            session = {"board":z.reshape(int(data["rows"]), int(data["cols"])), "generation":data.get("generation", -1)}
+        elif session is None and "session" in data and trigger["prop_id"].split(".")[0] not in ["button-gol-clear", "upload-gol-pattern"]:
+            # Ask the client for its live cells, rather than wiping its board, unless they are replaced anyway.
+            return {"session":key, "resync":True}
+        session = session or {"board":np.zeros((rows, cols), dtype=np.uint8), "generation":-1}
+        board = get_gol_board(z=session["board"], rows=rows, cols=cols)
+        generation = session["generation"]
+        resend = generation!=data.get("generation") or session["board"].shape!=board.shape
+        boards = []
+        # Keep the game of the last batch, unless cells are edited.
+        edited = trigger["prop_id"].split(".")[0] in ["graph-gol", "button-gol-clear", "upload-gol-pattern"]
+        game = None if edited else session.get("game")
 
-        # Set annotations.
-        if state=="Play":
-            figure["layout"]["title"] = pause_title
-            datum["name"] = pause_info
-        elif state=="Pause":
-            figure["layout"]["title"] = play_title
-            datum["name"] = ""
-        
         if trigger["prop_id"].endswith("clickData") or trigger["prop_id"].endswith("selectedData"):
             if state=="Pause" or trigger["value"] is None:
                 raise dex.PreventUpdate
-            # Flip selected cells.
+            # Flip selected cells, as many times as they are selected.
+            flips = np.zeros((rows, cols), dtype=np.uint8)
             points = trigger["value"].get("points", [])
+            xy = np.array([(point["x"], point["y"]) for point in points], dtype=np.int64).reshape(-1, 2)
+            inside = (xy[:, 0]>=0) & (xy[:, 0]<cols) & (xy[:, 1]>=0) & (xy[:, 1]<rows)
+            np.add.at(flips, (xy[inside, 1], xy[inside, 0]), 1)
             if "range" in trigger["value"]:
                 xmin, xmax = trigger["value"]["range"]["x"]
                 ymin, ymax = trigger["value"]["range"]["y"]
-                points.extend(
-                    {"x":x, "y":y}
-                    for x in range(int(xmin)+1, int(xmax))
-                    if 0<=x<cols
-                    for y in range(int(ymin)+1, int(ymax))
-                    if 0<=y<rows
-                )
-            for point in points:
-                i = rows*point["x"] + point["y"]
-                datum["z"][i] = 1 - datum["z"][i]
-            return figure, config
-        
-        if trigger["prop_id"].endswith("clear.n_clicks"):
+                flips[max(int(ymin)+1, 0):max(int(ymax), 0), max(int(xmin)+1, 0):max(int(xmax), 0)] += 1
+            boards.append(board ^ (flips & 1))
+        elif trigger["prop_id"].endswith("clear.n_clicks"):
             # Clear cells.
-            cells = []
+            boards.append(np.zeros((rows, cols), dtype=np.uint8))
+        elif trigger["prop_id"].endswith("contents"):
+            # Load an uploaded pattern, centered on the board.
+            if contents is None:
+                raise dex.PreventUpdate
+            try:
+                text = base64.b64decode(contents.split(",", 1)[-1]).decode()
+                cells, _ = GameOfLife.read_pattern(path=io.StringIO(text))
+            except (ValueError, UnicodeDecodeError):
+                # Ignore unreadable files.
+                raise dex.PreventUpdate
+            cells = cells.astype(np.int64)
+            if len(cells):
+                cells -= (cells.min(axis=0) + cells.max(axis=0))//2 - [cols//2, rows//2]
+            boards.append(set_gol_cells(cells=cells, rows=rows, cols=cols))
+        elif trigger["prop_id"].endswith("n_intervals") or (trigger["prop_id"].endswith("disabled") and not disabled):
+            # Evolve a batch of generations, keeping the game between batches unless the board was edited.
+            if game is None or game.rule!=rule or game.bounds!=(cols, rows):
+                game = GameOfLife(state=get_gol_cells(board=board), engine="numpy", rule=rule, bounds=(cols, rows))
+            for _ in range(int(batch)):
+                cells = game.advance(n=1)
+                if game.period==1:
+                    # Skip redrawing still lifes.
+                    break
+                boards.append(set_gol_cells(cells=cells, rows=rows, cols=cols))
+            if not boards and not resend and trigger["prop_id"].endswith("n_intervals"):
+                # Skip intervals without changes, but still switch annotations on play.
+                raise dex.PreventUpdate
+        next_board = boards[-1] if boards else board
+        gol_sessions.put(key=key, board=next_board, generation=generation+len(boards), game=game)
+
+        # Send frames of changed cells, or all live cells when resending, as flat indices y*cols+x.
+        delta = {"session":key, "generation":generation+len(boards), "rows":rows, "cols":cols}
+        if resend:
+            delta["board"] = np.flatnonzero(next_board).tolist()
         else:
-            # Extract live cells.
-            cells = [(x, y) for x, y, z in zip(datum["x"], datum["y"], datum["z"]) if z]
-            if trigger["prop_id"].endswith("n_intervals"):
-                gol = GameOfLife(state=cells)
-                cells = next(gol)
-        
-        xyzd = dict(zip(
-            ["x", "y", "z"],
-            zip(*[(*xy, int(xy in cells)) for xy in it.product(range(cols), range(rows))]),
-        ))
-        datum.update(xyzd)
-        return figure, config
-        
+            delta["frames"] = [
+                np.flatnonzero(prev^curr).tolist()
+                for prev, curr in zip([board, *boards], boards)
+            ]
+            delta["duration"] = int(tdur) if trigger["prop_id"].startswith("interval") else 0
+
+        # Set annotations, unchanged by interval updates.
+        if trigger["prop_id"].endswith("n_intervals") and not resend:
+            pass
+        elif state=="Play":
+            delta["title"] = pause_title
+            delta["name"] = pause_info
+        elif state=="Pause":
+            delta["title"] = play_title
+            delta["name"] = ""
+        return delta
+
+    app.clientside_callback(
+        ddp.ClientsideFunction(namespace="gol", function_name="applyDelta"),
+        ddp.Output("store-gol", "data"),
+        [ddp.Input("store-gol-delta", "data")],
+        [
+            ddp.State("graph-gol", "id"),
+            ddp.State("store-gol", "data"),
+        ],
+    )